@@ -9,89 +9,264 @@ Usage:
     hp = HappyPlaces("/path/to/happy_places.db")
     hp.register_item("tag_01", label="left sock")
     hp.record_sighting("tag_01", zone="bedroom_floor", seen_with=["tag_02","tag_03"])
+    hp.record_sightings_batch([{"item_id": "tag_02", "zone": "hallway"}, {"item_id": "tag_03", "zone": "hallway"}])
     hp.last_seen("tag_01")
     hp.recent_neighbors("tag_01", limit=5)
+    hp.search_items("sock")
 """
-import sqlite3, datetime, json
+import sqlite3, datetime, json, threading, time
+from contextlib import contextmanager
+from functools import lru_cache
+
+# applied once per connection; WAL + NORMAL sync keeps writes off the fsync path.
+# page_size/auto_vacuum only take effect on a fresh file, so they run before journal_mode.
+_PRAGMAS = (
+    "PRAGMA page_size=8192",
+    "PRAGMA auto_vacuum=INCREMENTAL",
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-20000",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA busy_timeout=5000",
+)
+
+# hot-path SQL kept as constants so every call hits the connection's statement cache
+_SQL_INSERT_ITEM = "INSERT OR IGNORE INTO items(item_id, label) VALUES(?,?)"
+# sighting_id is derived in SQL from the bound item_id/ts; same (item, ts) still replaces
+_SQL_INSERT_SIGHTING = ("INSERT OR REPLACE INTO sightings(sighting_id, item_id, zone, ts, metadata) "
+                        "VALUES('s_' || ?1 || '_' || ?2, ?1, ?3, ?2, ?4)")
+_SQL_INSERT_COPRESENCE = "INSERT INTO co_presence(item_a, item_b, ts, zone) VALUES(?,?,?,?)"
+# above this many pairs, one multi-row INSERT beats stepping executemany row by row
+_MULTIROW_MIN_PAIRS = 8
+_SQL_LAST_SEEN = "SELECT ts, zone, metadata FROM sightings WHERE item_id=? ORDER BY ts DESC LIMIT 1"
+# co_presence holds each pair once (item_a < item_b), so look up both columns
+_SQL_RECENT_NEIGHBORS = ("SELECT item_b AS peer, ts, zone FROM co_presence WHERE item_a=?1 "
+                         "UNION ALL SELECT item_a, ts, zone FROM co_presence WHERE item_b=?1 "
+                         "ORDER BY ts DESC LIMIT ?2")
+_SQL_ITEMS = "SELECT item_id, label FROM items"
+_SQL_SEARCH_ITEMS = "SELECT item_id, label FROM items_fts WHERE items_fts MATCH ? ORDER BY rank"
+# correlated NOT EXISTS stops at the first recent sighting via idx_sightings_item_ts
+_SQL_MISSING_SINCE = ("SELECT i.item_id FROM items i WHERE NOT EXISTS "
+                      "(SELECT 1 FROM sightings s WHERE s.item_id = i.item_id AND s.ts > ?)")
+
+def _now_micros():
+    return time.time_ns() // 1000
+
+def _to_micros(ts):
+    """Accept unix-micros, a datetime, or an ISO-8601 string (naive means UTC)."""
+    if ts is None:
+        return _now_micros()
+    if isinstance(ts, (int, float)):
+        return int(ts)
+    if isinstance(ts, str):
+        ts = datetime.datetime.fromisoformat(ts)
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=datetime.timezone.utc)
+    return int(ts.timestamp() * 1_000_000)
+
+@lru_cache(maxsize=4096)
+def _iso_seconds(s):
+    # neighbours of one sighting share a second, so this prefix is reused across rows
+    return time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(s))
+
+def _micros_to_iso(us):
+    s, frac = divmod(us, 1_000_000)
+    return f"{_iso_seconds(s)}.{frac:06d}+00:00"
+
+@lru_cache(maxsize=None)
+def _sql_insert_copresence_rows(n):
+    return "INSERT INTO co_presence(item_a, item_b, ts, zone) VALUES" + ",".join(["(?,?,?,?)"] * n)
 
 class HappyPlaces:
     def __init__(self, db_path="happy_places.db"):
         self.db_path = db_path
+        # one long-lived connection in autocommit mode; transactions are explicit in _write()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None,
+                                     cached_statements=256)
+        for pragma in _PRAGMAS:
+            self._conn.execute(pragma)
+        self._write_lock = threading.Lock()
+        # rows per multi-row INSERT, bounded by the bind-variable limit (999 on older SQLite builds)
+        max_vars = self._conn.getlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER) if hasattr(self._conn, "getlimit") else 999
+        self._copresence_rows_per_insert = max_vars // 4
         self._init_db()
 
-    def _connect(self):
-        return sqlite3.connect(self.db_path)
+    @contextmanager
+    def _write(self):
+        """Yield the shared connection inside a single BEGIN IMMEDIATE ... COMMIT."""
+        with self._write_lock:
+            c = self._conn
+            c.execute("BEGIN IMMEDIATE")
+            try:
+                yield c
+            except BaseException:
+                c.execute("ROLLBACK")
+                raise
+            c.execute("COMMIT")
+
+    @contextmanager
+    def _read(self):
+        yield self._conn
+
+    def close(self):
+        self._conn.close()
 
     def _init_db(self):
-        with self._connect() as c:
+        with self._write() as c:
+            # files from older versions (TEXT ts, rowid tables) are rebuilt in place
+            stale = [t for t in ("items", "sightings", "co_presence") if self._is_stale(c, t)]
+            c.execute("PRAGMA legacy_alter_table=ON")  # keep FK references pointing at the new tables
+            for table in stale:
+                c.execute(f"ALTER TABLE {table} RENAME TO {table}_old")
+            c.execute("PRAGMA legacy_alter_table=OFF")
+            # items/sightings have stable text keys: WITHOUT ROWID keeps one clustered B-tree instead of two
             c.execute("""CREATE TABLE IF NOT EXISTS items (
                             item_id TEXT PRIMARY KEY,
                             label TEXT
-                        )""")
+                        ) WITHOUT ROWID""")
+            # ts is unix microseconds: integer compares and smaller index entries than ISO text
             c.execute("""CREATE TABLE IF NOT EXISTS sightings (
                             sighting_id TEXT PRIMARY KEY,
                             item_id TEXT,
                             zone TEXT,
-                            ts TEXT,
+                            ts INTEGER NOT NULL,
                             metadata TEXT,
                             FOREIGN KEY(item_id) REFERENCES items(item_id)
-                        )""")
+                        ) WITHOUT ROWID""")
             c.execute("""CREATE TABLE IF NOT EXISTS co_presence (
                             id INTEGER PRIMARY KEY AUTOINCREMENT,
                             item_a TEXT,
                             item_b TEXT,
-                            ts TEXT,
+                            ts INTEGER NOT NULL,
                             zone TEXT
                         )""")
-            c.commit()
+            if stale:
+                self._copy_from_old(c, stale)
+            if c.execute("PRAGMA user_version").fetchone()[0] < 1:
+                # older databases stored every pair in both directions; keep the canonical half
+                c.execute("DELETE FROM co_presence WHERE item_a > item_b")
+                c.execute("PRAGMA user_version=1")
+            # last_seen / recent_neighbors become index range scans; the co_presence one is covering
+            c.execute("CREATE INDEX IF NOT EXISTS idx_sightings_item_ts ON sightings(item_id, ts DESC)")
+            c.execute("CREATE INDEX IF NOT EXISTS idx_copresence_a_ts ON co_presence(item_a, ts DESC, item_b, zone)")
+            c.execute("CREATE INDEX IF NOT EXISTS idx_copresence_b_ts ON co_presence(item_b, ts DESC, item_a, zone)")
+            c.execute("CREATE INDEX IF NOT EXISTS idx_sightings_ts ON sightings(ts)")
+            self._init_label_search(c)
+
+    @staticmethod
+    def _init_label_search(c):
+        """FTS5 index over items.label, kept in sync by triggers.
+        items is WITHOUT ROWID so there is no rowid for external content; the fts row carries item_id instead.
+        """
+        exists = c.execute("SELECT 1 FROM sqlite_master WHERE name='items_fts'").fetchone()
+        c.execute("CREATE VIRTUAL TABLE IF NOT EXISTS items_fts USING fts5("
+                  "item_id UNINDEXED, label, tokenize='unicode61 remove_diacritics 2')")
+        c.execute("""CREATE TRIGGER IF NOT EXISTS items_ai AFTER INSERT ON items BEGIN
+                        INSERT INTO items_fts(item_id, label) VALUES (new.item_id, new.label);
+                    END""")
+        c.execute("""CREATE TRIGGER IF NOT EXISTS items_ad AFTER DELETE ON items BEGIN
+                        DELETE FROM items_fts WHERE item_id = old.item_id;
+                    END""")
+        c.execute("""CREATE TRIGGER IF NOT EXISTS items_au AFTER UPDATE ON items BEGIN
+                        DELETE FROM items_fts WHERE item_id = old.item_id;
+                        INSERT INTO items_fts(item_id, label) VALUES (new.item_id, new.label);
+                    END""")
+        if not exists:
+            c.execute("INSERT INTO items_fts(item_id, label) SELECT item_id, label FROM items")
+
+    @staticmethod
+    def _is_stale(c, table):
+        row = c.execute("SELECT sql FROM sqlite_master WHERE type='table' AND name=?", (table,)).fetchone()
+        if row is None:
+            return False
+        cols = c.execute(f"PRAGMA table_info({table})").fetchall()
+        if any(col[1] == "ts" and col[2].upper() == "TEXT" for col in cols):
+            return True
+        return table in ("items", "sightings") and "WITHOUT ROWID" not in row[0].upper()
+
+    @staticmethod
+    def _copy_from_old(c, tables):
+        """One-off copy of rebuilt tables; ISO-text timestamps are converted to unix-micros."""
+        c.create_function("to_micros", 1, _to_micros, deterministic=True)
+        for table in tables:
+            cols = [col[1] for col in c.execute(f"PRAGMA table_info({table})").fetchall()]
+            select = ", ".join("to_micros(ts)" if col == "ts" else col for col in cols)
+            c.execute(f"INSERT INTO {table}({', '.join(cols)}) SELECT {select} FROM {table}_old")
+            c.execute(f"DROP TABLE {table}_old")
 
     def register_item(self, item_id, label=None):
-        with self._connect() as c:
-            c.execute("INSERT OR IGNORE INTO items(item_id, label) VALUES(?,?)", (item_id, label))
-            c.commit()
+        with self._write() as c:
+            c.execute(_SQL_INSERT_ITEM, (item_id, label))
 
     def record_sighting(self, item_id, zone=None, ts=None, seen_with=None, metadata=None):
         """Record that item_id was seen in zone at time ts and optionally seen_with other item_ids (co-presence).
         seen_with should be a list of other item_ids (strings).
+        ts may be unix-micros, a datetime or an ISO-8601 string; defaults to now.
         """
-        if ts is None:
-            ts = datetime.datetime.utcnow().isoformat()
+        with self._write() as c:
+            self._insert_sighting(c, item_id, zone, ts, seen_with, metadata)
+
+    def record_sightings_batch(self, events):
+        """Record many sightings in one transaction.
+        events is an iterable of dicts with the same keys as record_sighting's arguments
+        (item_id required; zone, ts, seen_with, metadata optional).
+        """
+        with self._write() as c:
+            for e in events:
+                self._insert_sighting(c, e["item_id"], e.get("zone"), e.get("ts"), e.get("seen_with"), e.get("metadata"))
+
+    def _insert_sighting(self, c, item_id, zone, ts, seen_with, metadata):
+        ts = _to_micros(ts)
         if seen_with is None:
             seen_with = []
-        meta_json = json.dumps(metadata or {})
-        sighting_id = f"s_{item_id}_{ts}"
-        with self._connect() as c:
-            c.execute("INSERT OR REPLACE INTO sightings(sighting_id, item_id, zone, ts, metadata) VALUES(?,?,?,?,?)",
-                      (sighting_id, item_id, zone, ts, meta_json))
-            # create co-presence pairs (item_id with each seen_with entry)
-            for other in seen_with:
-                # store both directions to make queries simpler
-                c.execute("INSERT INTO co_presence(item_a, item_b, ts, zone) VALUES(?,?,?,?)", (item_id, other, ts, zone))
-                c.execute("INSERT INTO co_presence(item_a, item_b, ts, zone) VALUES(?,?,?,?)", (other, item_id, ts, zone))
-            c.commit()
+        meta_json = json.dumps(metadata) if metadata else None
+        c.execute(_SQL_INSERT_SIGHTING, (item_id, ts, zone, meta_json))
+        # create co-presence pairs (item_id with each seen_with entry), stored once as (min, max)
+        pairs = [(*sorted((item_id, o)), ts, zone) for o in seen_with]
+        if len(pairs) <= _MULTIROW_MIN_PAIRS:
+            c.executemany(_SQL_INSERT_COPRESENCE, pairs)
+            return
+        step = self._copresence_rows_per_insert
+        for i in range(0, len(pairs), step):
+            chunk = pairs[i:i + step]
+            c.execute(_sql_insert_copresence_rows(len(chunk)), [v for row in chunk for v in row])
 
     def last_seen(self, item_id):
-        with self._connect() as c:
-            r = c.execute("SELECT ts, zone, metadata FROM sightings WHERE item_id=? ORDER BY ts DESC LIMIT 1", (item_id,)).fetchone()
+        with self._read() as c:
+            r = c.execute(_SQL_LAST_SEEN, (item_id,)).fetchone()
             if not r:
                 return None
             ts, zone, meta = r
-            return {"item_id": item_id, "last_seen": ts, "zone": zone, "metadata": json.loads(meta)}
+            return {"item_id": item_id, "last_seen": _micros_to_iso(ts), "zone": zone, "metadata": {} if meta is None else json.loads(meta)}
 
     def recent_neighbors(self, item_id, limit=10):
         """Return a summary of the most recent neighbors seen with item_id."""
-        with self._connect() as c:
-            rows = c.execute("SELECT item_b, ts, zone FROM co_presence WHERE item_a=? ORDER BY ts DESC LIMIT ?", (item_id, limit)).fetchall()
-            return [{"item_id": r[0], "ts": r[1], "zone": r[2]} for r in rows]
+        with self._read() as c:
+            rows = c.execute(_SQL_RECENT_NEIGHBORS, (item_id, limit)).fetchall()
+            return [{"item_id": r[0], "ts": _micros_to_iso(r[1]), "zone": r[2]} for r in rows]
 
     def items(self):
-        with self._connect() as c:
-            rows = c.execute("SELECT item_id, label FROM items").fetchall()
+        with self._read() as c:
+            rows = c.execute(_SQL_ITEMS).fetchall()
+            return [{"item_id": r[0], "label": r[1]} for r in rows]
+
+    def search_items(self, text):
+        """Return items whose label contains every word in text, in any order (each word may be a prefix)."""
+        query = ' '.join('"%s"*' % t.replace('"', '""') for t in text.split())
+        if not query:
+            return []
+        with self._read() as c:
+            rows = c.execute(_SQL_SEARCH_ITEMS, (query,)).fetchall()
             return [{"item_id": r[0], "label": r[1]} for r in rows]
 
     def missing_since(self, days=3):
         """Return items not seen in the last `days` days."""
-        cutoff = (datetime.datetime.utcnow() - datetime.timedelta(days=days)).isoformat()
-        with self._connect() as c:
-            rows = c.execute("SELECT item_id FROM items WHERE item_id NOT IN (SELECT DISTINCT item_id FROM sightings WHERE ts > ?)", (cutoff,)).fetchall()
-            return [r[0] for r in rows]
+        cutoff = _now_micros() - days * 86_400_000_000
+        with self._read() as c:
+            rows = c.execute(_SQL_MISSING_SINCE, (cutoff,)).fetchall()
+        # periodic housekeeping: hand back up to 1000 free pages (no-op unless auto_vacuum is incremental).
+        # the pragma frees one page per step, so run it through executescript, which steps to completion
+        with self._write_lock:
+            self._conn.executescript("PRAGMA incremental_vacuum(1000);")
+        return [r[0] for r in rows]
@@ -1,16 +1,23 @@
 """
 # app.py - Cloud Flask Application (for Render)
-from flask import Flask, request, jsonify, render_template, send_from_directory
+from flask import Flask, request, jsonify, render_template, send_from_directory, Response, abort
 from flask_sqlalchemy import SQLAlchemy
+import sqlalchemy as sa
+import orjson
 from flask_cors import CORS
 import os
 import uuid
-import json
 from datetime import datetime
 from werkzeug.utils import secure_filename
 import boto3
+from boto3.s3.transfer import TransferConfig, create_transfer_manager
+from botocore.config import Config as BotoConfig
 from PIL import Image
 import io
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 app = Flask(__name__)
 CORS(app)
@@ -30,6 +37,48 @@ app.config['S3_REGION'] = os.environ.get('AWS_REGION', 'us-east-1')
 
 db = SQLAlchemy(app)
 
+@sa.event.listens_for(sa.engine.Engine, 'connect')
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    # local SQLite: WAL so worker polls don't block on the claim UPDATEs
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        cursor = dbapi_connection.cursor()
+        cursor.execute('PRAGMA journal_mode=WAL')
+        cursor.close()
+
+# Long-poll for /api/worker/jobs: uploads notify waiting workers in this process; the periodic
+# recheck picks up jobs queued by other gunicorn processes
+JOB_WAIT_MAX_SECONDS = 30
+JOB_RECHECK_SECONDS = 2
+jobs_available = threading.Condition()
+
+# Photos at or under this size that are already JPEG go to S3 untouched
+MAX_PHOTO_SIDE = 2048
+S3_TRANSFER_CONFIG = TransferConfig(multipart_threshold=8 * 1024 * 1024, max_concurrency=8, use_threads=True)
+
+# Resize/re-encode and S3 upload run here so one request's photos proceed in parallel;
+# Pillow and boto3 both release the GIL around codec and socket work
+photo_executor = ThreadPoolExecutor(max_workers=os.cpu_count())
+
+# One client (and its connection pool) and one transfer manager for the whole process,
+# built on first upload rather than once per photo
+s3_lock = threading.Lock()
+s3_transfer = None
+
+def get_s3_transfer():
+    global s3_transfer
+    if s3_transfer is None:
+        with s3_lock:
+            if s3_transfer is None:
+                client = boto3.client(
+                    's3',
+                    aws_access_key_id=app.config['S3_KEY'],
+                    aws_secret_access_key=app.config['S3_SECRET'],
+                    region_name=app.config['S3_REGION'],
+                    config=BotoConfig(max_pool_connections=32, retries={'max_attempts': 3, 'mode': 'adaptive'})
+                )
+                s3_transfer = create_transfer_manager(client, S3_TRANSFER_CONFIG)
+    return s3_transfer
+
 # Database Models
 class CaptureSession(db.Model):
     __tablename__ = 'capture_sessions'
@@ -49,24 +98,16 @@ class CaptureSession(db.Model):
     photos_url = db.Column(db.Text)
     
     def to_dict(self):
-        return {
-            'id': self.id,
-            'timestamp': self.timestamp.isoformat(),
-            'category': self.category,
-            'object_type': self.object_type,
-            'brand': self.brand,
-            'model': self.model,
-            'age_months': self.age_months,
-            'damage_severity': self.damage_severity,
-            'damage_types': json.loads(self.damage_types) if self.damage_types else [],
-            'num_photos': self.num_photos,
-            'processing_status': self.processing_status,
-            'notes': self.notes,
-            'photos_url': json.loads(self.photos_url) if self.photos_url else []
-        }
+        # same shape as the /api/sessions rows; JSON columns pass through as orjson fragments
+        return session_row_to_dict(self)
 
 class ProcessingJob(db.Model):
     __tablename__ = 'processing_jobs'
+    __table_args__ = (
+        # queue scan: first queued rows in created_at order straight off the index
+        db.Index('idx_jobs_status_created', 'status', 'created_at'),
+        db.Index('idx_jobs_session', 'session_id'),
+    )
     
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     session_id = db.Column(db.String(36), db.ForeignKey('capture_sessions.id'))
@@ -80,6 +121,9 @@ class ProcessingJob(db.Model):
 
 class WearAnalysis(db.Model):
     __tablename__ = 'wear_analysis'
+    __table_args__ = (
+        db.Index('idx_wear_session', 'session_id'),
+    )
     
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     session_id = db.Column(db.String(36), db.ForeignKey('capture_sessions.id'))
@@ -89,27 +133,96 @@ class WearAnalysis(db.Model):
     recommendations = db.Column(db.Text)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+# Columns served by /api/sessions, in the order the row tuples come back
+SESSION_LIST_COLUMNS = (
+    CaptureSession.id, CaptureSession.timestamp, CaptureSession.category, CaptureSession.object_type,
+    CaptureSession.brand, CaptureSession.model, CaptureSession.age_months, CaptureSession.damage_severity,
+    CaptureSession.damage_types, CaptureSession.num_photos, CaptureSession.processing_status,
+    CaptureSession.notes, CaptureSession.photos_url
+)
+
 # Helper functions
+def json_column(value):
+    # TEXT columns already hold JSON; emit them verbatim instead of loads-then-dumps
+    return orjson.Fragment(value) if value else orjson.Fragment(b'[]')
+
+def session_row_to_dict(row):
+    return {
+        'id': row.id,
+        'timestamp': row.timestamp.isoformat(),
+        'category': row.category,
+        'object_type': row.object_type,
+        'brand': row.brand,
+        'model': row.model,
+        'age_months': row.age_months,
+        'damage_severity': row.damage_severity,
+        'damage_types': json_column(row.damage_types),
+        'num_photos': row.num_photos,
+        'processing_status': row.processing_status,
+        'notes': row.notes,
+        'photos_url': json_column(row.photos_url)
+    }
+
+def dumps_text(value):
+    # JSON for the TEXT columns
+    return orjson.dumps(value).decode()
+
+def orjson_response(payload, status=200):
+    return Response(orjson.dumps(payload), status=status, mimetype='application/json')
+
 def upload_to_s3(file_data, filename):
     if not app.config['S3_BUCKET']:
         return f"/uploads/{filename}"
     
-    s3 = boto3.client(
-        's3',
-        aws_access_key_id=app.config['S3_KEY'],
-        aws_secret_access_key=app.config['S3_SECRET'],
-        region_name=app.config['S3_REGION']
-    )
-    
-    s3.upload_fileobj(
+    get_s3_transfer().upload(
         file_data,
         app.config['S3_BUCKET'],
         filename,
-        ExtraArgs={'ContentType': 'image/jpeg'}
-    )
+        extra_args={'ContentType': 'image/jpeg'}
+    ).result()
     
     return f"https://{app.config['S3_BUCKET']}.s3.{app.config['S3_REGION']}.amazonaws.com/{filename}"
 
+# Atomically move a job from one of from_statuses to to_status and mirror it on the session.
+# Returns (session_id, None) on success, or (None, error response) if the job is missing or already moved on.
+def transition_job(job_id, from_statuses, to_status, **values):
+    claimed = db.session.execute(
+        sa.update(ProcessingJob)
+        .where(ProcessingJob.id == job_id, ProcessingJob.status.in_(from_statuses))
+        .values(status=to_status, **values)
+        .returning(ProcessingJob.session_id)
+    ).first()
+    if claimed is None:
+        db.session.rollback()
+        if db.session.get(ProcessingJob, job_id) is None:
+            return None, (jsonify({'error': 'Job not found'}), 404)
+        return None, (jsonify({'error': f'Job is no longer {" or ".join(from_statuses)}'}), 409)
+    
+    db.session.execute(
+        sa.update(CaptureSession)
+        .where(CaptureSession.id == claimed.session_id)
+        .values(processing_status=to_status)
+    )
+    return claimed.session_id, None
+
+def prepare_photo(file):
+    # Image.open only reads the header, so this is cheap when no resize is needed.
+    # Photos are public, so only pass through JPEGs without EXIF/XMP (GPS, device);
+    # re-encoding drops that metadata
+    img = Image.open(file)
+    if (img.format == 'JPEG' and max(img.size) <= MAX_PHOTO_SIDE
+            and not img.getexif() and 'xmp' not in img.info):
+        img.close()
+        file.stream.seek(0)
+        return file.stream
+    
+    img.thumbnail((MAX_PHOTO_SIDE, MAX_PHOTO_SIDE), Image.Resampling.LANCZOS)
+    
+    buffer = io.BytesIO()
+    img.save(buffer, format='JPEG', quality=85)
+    buffer.seek(0)
+    return buffer
+
 # Routes
 @app.route('/')
 def index():
@@ -125,24 +238,18 @@ def upload_photos():
         return jsonify({'error': 'No photos provided'}), 400
     
     files = request.files.getlist('photos')
-    metadata = json.loads(request.form.get('metadata', '{}'))
+    metadata = orjson.loads(request.form.get('metadata', '{}'))
+    damage_types = metadata.get('damage_types')
     
     session_id = str(uuid.uuid4())
     timestamp = datetime.now()
     
-    photo_urls = []
-    for i, file in enumerate(files):
-        if file.filename:
-            img = Image.open(file)
-            img.thumbnail((2048, 2048), Image.Resampling.LANCZOS)
-            
-            buffer = io.BytesIO()
-            img.save(buffer, format='JPEG', quality=85)
-            buffer.seek(0)
-            
-            filename = f"{session_id}/{i:03d}.jpg"
-            url = upload_to_s3(buffer, filename)
-            photo_urls.append(url)
+    def process_photo(i, file):
+        return upload_to_s3(prepare_photo(file), f"{session_id}/{i:03d}.jpg")
+    
+    # map keeps photo order stable for photos_url
+    named = [(i, f) for i, f in enumerate(files) if f.filename]
+    photo_urls = list(photo_executor.map(lambda args: process_photo(*args), named))
     
     session = CaptureSession(
         id=session_id,
@@ -153,10 +260,10 @@ def upload_photos():
         model=metadata.get('model', ''),
         age_months=metadata.get('age_months', 0),
         damage_severity=metadata.get('damage_severity', 5),
-        damage_types=json.dumps(metadata.get('damage_types', [])),
+        damage_types=dumps_text(damage_types) if damage_types else None,
         num_photos=len(photo_urls),
         notes=metadata.get('notes', ''),
-        photos_url=json.dumps(photo_urls)
+        photos_url=dumps_text(photo_urls)
     )
     db.session.add(session)
     
@@ -166,6 +273,8 @@ def upload_photos():
     )
     db.session.add(job)
     db.session.commit()
+    with jobs_available:
+        jobs_available.notify_all()
     
     return jsonify({
         'session_id': session_id,
@@ -175,21 +284,34 @@ def upload_photos():
 
 @app.route('/api/sessions')
 def get_sessions():
-    sessions = CaptureSession.query.order_by(CaptureSession.timestamp.desc()).limit(100).all()
-    return jsonify([s.to_dict() for s in sessions])
+    rows = db.session.execute(
+        sa.select(*SESSION_LIST_COLUMNS).order_by(CaptureSession.timestamp.desc()).limit(100)
+    ).all()
+    return orjson_response([session_row_to_dict(r) for r in rows])
 
 @app.route('/api/session/<session_id>')
 def get_session_details(session_id):
-    session = CaptureSession.query.get_or_404(session_id)
-    analysis = WearAnalysis.query.filter_by(session_id=session_id).first()
-    job = ProcessingJob.query.filter_by(session_id=session_id).first()
+    # read-only: project just the columns served, no ORM objects
+    session = db.session.execute(
+        sa.select(*SESSION_LIST_COLUMNS).where(CaptureSession.id == session_id)
+    ).first()
+    if session is None:
+        abort(404)
+    analysis = db.session.execute(
+        sa.select(WearAnalysis.wear_percentage, WearAnalysis.predicted_failure_days, WearAnalysis.recommendations)
+        .where(WearAnalysis.session_id == session_id).limit(1)
+    ).first()
+    job = db.session.execute(
+        sa.select(ProcessingJob.status, ProcessingJob.started_at, ProcessingJob.completed_at, ProcessingJob.error_message)
+        .where(ProcessingJob.session_id == session_id).limit(1)
+    ).first()
     
-    return jsonify({
-        'session': session.to_dict(),
+    return orjson_response({
+        'session': session_row_to_dict(session),
         'analysis': {
             'wear_percentage': analysis.wear_percentage,
             'predicted_failure_days': analysis.predicted_failure_days,
-            'recommendations': json.loads(analysis.recommendations) if analysis.recommendations else []
+            'recommendations': json_column(analysis.recommendations)
         } if analysis else None,
         'processing': {
             'status': job.status,
@@ -206,23 +328,43 @@ def get_pending_jobs():
     if api_key != app.config['WORKER_API_KEY']:
         return jsonify({'error': 'Unauthorized'}), 401
     
-    jobs = ProcessingJob.query.filter_by(status='queued').order_by(ProcessingJob.created_at).limit(5).all()
+    # ?wait_seconds=N holds the request until a job is queued or N seconds pass
+    wait_seconds = min(request.args.get('wait_seconds', 0, type=float), JOB_WAIT_MAX_SECONDS)
+    deadline = time.monotonic() + wait_seconds
+    while True:
+        # one joined query instead of a session lookup per job
+        rows = db.session.execute(
+            sa.select(
+                ProcessingJob.id, ProcessingJob.session_id, CaptureSession.photos_url,
+                CaptureSession.category, CaptureSession.object_type, CaptureSession.damage_severity
+            )
+            .join(CaptureSession, CaptureSession.id == ProcessingJob.session_id)
+            .where(ProcessingJob.status == 'queued')
+            .order_by(ProcessingJob.created_at)
+            .limit(5)
+        ).all()
+        remaining = deadline - time.monotonic()
+        if rows or remaining <= 0:
+            break
+        # end the read transaction so the next query sees newly committed jobs
+        db.session.rollback()
+        with jobs_available:
+            jobs_available.wait(timeout=min(remaining, JOB_RECHECK_SECONDS))
     
     result = []
-    for job in jobs:
-        session = CaptureSession.query.get(job.session_id)
+    for row in rows:
         result.append({
-            'job_id': job.id,
-            'session_id': job.session_id,
-            'photos_url': json.loads(session.photos_url) if session.photos_url else [],
+            'job_id': row.id,
+            'session_id': row.session_id,
+            'photos_url': json_column(row.photos_url),
             'metadata': {
-                'category': session.category,
-                'object_type': session.object_type,
-                'damage_severity': session.damage_severity
+                'category': row.category,
+                'object_type': row.object_type,
+                'damage_severity': row.damage_severity
             }
         })
     
-    return jsonify(result)
+    return orjson_response(result)
 
 @app.route('/api/worker/jobs/<job_id>/start', methods=['POST'])
 def start_job(job_id):
@@ -230,13 +372,14 @@ def start_job(job_id):
     if api_key != app.config['WORKER_API_KEY']:
         return jsonify({'error': 'Unauthorized'}), 401
     
-    job = ProcessingJob.query.get_or_404(job_id)
-    job.status = 'processing'
-    job.started_at = datetime.utcnow()
-    job.worker_id = request.json.get('worker_id', 'unknown')
-    
-    session = CaptureSession.query.get(job.session_id)
-    session.processing_status = 'processing'
+    # UPDATE ... WHERE status='queued' RETURNING: only one worker can win the claim
+    _, error = transition_job(
+        job_id, ('queued',), 'processing',
+        started_at=datetime.utcnow(),
+        worker_id=request.json.get('worker_id', 'unknown')
+    )
+    if error:
+        return error
     
     db.session.commit()
     return jsonify({'success': True})
@@ -247,23 +390,23 @@ def complete_job(job_id):
     if api_key != app.config['WORKER_API_KEY']:
         return jsonify({'error': 'Unauthorized'}), 401
     
-    job = ProcessingJob.query.get_or_404(job_id)
     data = request.json
     
-    job.status = 'completed'
-    job.completed_at = datetime.utcnow()
-    job.result_data = json.dumps(data.get('results', {}))
-    
-    session = CaptureSession.query.get(job.session_id)
-    session.processing_status = 'completed'
+    session_id, error = transition_job(
+        job_id, ('processing',), 'completed',
+        completed_at=datetime.utcnow(),
+        result_data=dumps_text(data.get('results', {}))
+    )
+    if error:
+        return error
     
     if 'analysis' in data:
         analysis = WearAnalysis(
-            session_id=job.session_id,
+            session_id=session_id,
             wear_percentage=data['analysis'].get('wear_percentage', 0),
-            critical_points=json.dumps(data['analysis'].get('critical_points', [])),
+            critical_points=dumps_text(data['analysis'].get('critical_points', [])),
             predicted_failure_days=data['analysis'].get('predicted_failure_days', 0),
-            recommendations=json.dumps(data['analysis'].get('recommendations', []))
+            recommendations=dumps_text(data['analysis'].get('recommendations', []))
         )
         db.session.add(analysis)
     
@@ -276,13 +419,13 @@ def fail_job(job_id):
     if api_key != app.config['WORKER_API_KEY']:
         return jsonify({'error': 'Unauthorized'}), 401
     
-    job = ProcessingJob.query.get_or_404(job_id)
-    job.status = 'failed'
-    job.completed_at = datetime.utcnow()
-    job.error_message = request.json.get('error', 'Unknown error')
-    
-    session = CaptureSession.query.get(job.session_id)
-    session.processing_status = 'failed'
+    _, error = transition_job(
+        job_id, ('queued', 'processing'), 'failed',
+        completed_at=datetime.utcnow(),
+        error_message=request.json.get('error', 'Unknown error')
+    )
+    if error:
+        return error
     
     db.session.commit()
     return jsonify({'success': True})
@@ -5,12 +5,18 @@ import sys
 import time
 import json
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import subprocess
 import uuid
 from pathlib import Path
 from datetime import datetime
 import shutil
 import socket
+import signal
+import asyncio
+import tempfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # Configuration
 CLOUD_API_URL = os.environ.get('CLOUD_API_URL', 'https://your-app.onrender.com')
@@ -18,6 +24,23 @@ API_KEY = os.environ.get('WORKER_API_KEY', 'change-this-key')
 WORKER_ID = os.environ.get('WORKER_ID', socket.gethostname())
 WORK_DIR = Path(os.environ.get('WORK_DIR', './worker_data'))
 POLL_INTERVAL = int(os.environ.get('POLL_INTERVAL', '30'))
+# The cloud API holds each poll open this long waiting for a job, so no client-side sleep is needed
+POLL_WAIT_SECONDS = int(os.environ.get('POLL_WAIT_SECONDS', '30'))
+COLMAP_TIMEOUT = int(os.environ.get('COLMAP_TIMEOUT', '3600'))
+COLMAP_CHECK_CACHE = Path(os.environ.get('COLMAP_CHECK_CACHE', Path.home() / '.cache' / 'worker'))
+
+DOWNLOAD_WORKERS = int(os.environ.get('DOWNLOAD_WORKERS', '16'))
+
+# Keep-alive connections shared by photo downloads and the job API calls
+SESSION = requests.Session()
+SESSION.mount('https://', HTTPAdapter(
+    pool_connections=32,
+    pool_maxsize=32,
+    max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=(500, 502, 503, 504))
+))
+
+# Sends the start claim while the job's photos download
+CLAIM_EXECUTOR = ThreadPoolExecutor(max_workers=1)
 
 # Setup directories
 WORK_DIR.mkdir(parents=True, exist_ok=True)
@@ -29,35 +52,59 @@ def log(message):
     print(f"[{timestamp}] {message}", flush=True)
 
 def check_colmap():
+    colmap_path = shutil.which('colmap')
+    if not colmap_path:
+        log("COLMAP check failed: colmap not on PATH")
+        return False
+    
+    # A passing check is remembered per binary mtime, so restarts skip the 'colmap -h' run
+    marker = COLMAP_CHECK_CACHE / f"colmap_ok_{os.stat(colmap_path).st_mtime_ns}"
+    if marker.exists():
+        return True
+    
     try:
-        result = subprocess.run(['colmap', '-h'], capture_output=True, timeout=5)
-        return result.returncode == 0
+        result = subprocess.run([colmap_path, '-h'], capture_output=True, timeout=5)
     except Exception as e:
         log(f"COLMAP check failed: {e}")
         return False
+    
+    if result.returncode != 0:
+        return False
+    try:
+        COLMAP_CHECK_CACHE.mkdir(parents=True, exist_ok=True)
+        marker.touch()
+    except OSError:
+        pass
+    return True
 
 def download_photos(photos_url, job_dir):
     photos_dir = job_dir / 'images'
     photos_dir.mkdir(exist_ok=True)
     
-    downloaded = []
-    for i, url in enumerate(photos_url):
-        try:
-            response = requests.get(url, timeout=30)
+    def fetch(i, url):
+        filepath = photos_dir / f"{i:03d}.jpg"
+        with SESSION.get(url, timeout=30, stream=True) as response:
             response.raise_for_status()
-            
-            filepath = photos_dir / f"{i:03d}.jpg"
-            filepath.write_bytes(response.content)
-            downloaded.append(str(filepath))
-            
-        except Exception as e:
-            log(f"Failed to download photo {i}: {e}")
-            raise
+            with open(filepath, 'wb') as f:
+                shutil.copyfileobj(response.raw, f, length=1 << 16)
+        return str(filepath)
+    
+    downloaded = []
+    with ThreadPoolExecutor(max_workers=DOWNLOAD_WORKERS) as pool:
+        futures = {pool.submit(fetch, i, url): i for i, url in enumerate(photos_url)}
+        for future in as_completed(futures):
+            try:
+                downloaded.append(future.result())
+            except Exception as e:
+                log(f"Failed to download photo {futures[future]}: {e}")
+                for other in futures:
+                    other.cancel()
+                raise
     
     log(f"Downloaded {len(downloaded)} photos")
     return str(photos_dir)
 
-def run_colmap(images_dir, workspace_dir):
+async def run_colmap(images_dir, workspace_dir):
     log("Starting COLMAP processing...")
     workspace_dir = Path(workspace_dir)
     workspace_dir.mkdir(exist_ok=True)
@@ -75,16 +122,26 @@ def run_colmap(images_dir, workspace_dir):
         
         log(f"Running: {' '.join(cmd)}")
         
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=3600
-        )
+        # Stream output to a file rather than a pipe (a full pipe buffer stalls COLMAP),
+        # and give it its own process group so a timeout kills its children too
+        log_path = workspace_dir / 'colmap.log'
+        with open(log_path, 'wb') as log_file:
+            proc = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdout=log_file,
+                stderr=subprocess.STDOUT,
+                start_new_session=True
+            )
+            try:
+                returncode = await asyncio.wait_for(proc.wait(), timeout=COLMAP_TIMEOUT)
+            except (asyncio.TimeoutError, asyncio.CancelledError):
+                os.killpg(proc.pid, signal.SIGKILL)
+                await proc.wait()
+                raise
         
-        if result.returncode != 0:
-            log(f"COLMAP stderr: {result.stderr}")
-            raise Exception(f"COLMAP failed with code {result.returncode}")
+        if returncode != 0:
+            # The last lines of the log go into the error so they're reported with the failed job
+            raise Exception(f"COLMAP failed with code {returncode}. Log tail: {tail_file(log_path)}")
         
         log("COLMAP processing completed")
         
@@ -94,17 +151,35 @@ def run_colmap(images_dir, workspace_dir):
         
         return str(model_path)
         
-    except subprocess.TimeoutExpired:
+    except asyncio.TimeoutError:
         raise Exception("COLMAP processing timed out")
     except Exception as e:
         log(f"COLMAP error: {e}")
         raise
 
+def tail_file(path, max_bytes=4096, max_lines=40):
+    # Only the last max_bytes are read, however large the log has grown
+    with open(path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        f.seek(max(0, f.tell() - max_bytes))
+        lines = f.read().decode(errors='replace').splitlines(keepends=True)
+    return ''.join(lines[-max_lines:])
+
 def find_model_file(workspace):
-    for root, dirs, files in os.walk(workspace):
-        for file in files:
-            if file.endswith('.ply'):
-                return Path(root) / file
+    # automatic_reconstructor writes the dense cloud here; avoid walking the workspace in the common case
+    fused = Path(workspace) / 'dense' / 'fused.ply'
+    if fused.is_file():
+        return fused
+    
+    # Depth-first over scandir, stopping at the first .ply
+    stack = [str(workspace)]
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.name.lower().endswith('.ply'):
+                    return Path(entry.path)
     return None
 
 def analyze_model(model_path):
@@ -130,69 +205,104 @@ def analyze_model(model_path):
 def upload_results(model_path, job_dir):
     return str(model_path)
 
-def process_job(job):
+def claim_and_download(job):
+    # Claim the job and fetch its photos. Returns the job dir, or None if the claim wasn't confirmed
     job_id = job['job_id']
-    session_id = job['session_id']
     
-    log(f"Processing job {job_id} (session {session_id})")
+    log(f"Processing job {job_id} (session {job['session_id']})")
     
     job_dir = WORK_DIR / 'jobs' / job_id
-    job_dir.mkdir(parents=True, exist_ok=True)
+    # Photos go to a directory private to this attempt and only move into job_dir once the
+    # claim is confirmed, so losing the claim never touches another attempt's files
+    attempt_dir = Path(tempfile.mkdtemp(prefix=f"{job_id}.", dir=WORK_DIR / 'jobs'))
     
+    # The claim's round-trip overlaps the download; its answer is still checked before
+    # anything is reported, so a job another worker owns is never failed by this one
+    claim = CLAIM_EXECUTOR.submit(
+        SESSION.post,
+        f"{CLOUD_API_URL}/api/worker/jobs/{job_id}/start",
+        headers={'X-API-Key': API_KEY},
+        json={'worker_id': WORKER_ID},
+        timeout=10
+    )
+    download_error = None
     try:
-        requests.post(
-            f"{CLOUD_API_URL}/api/worker/jobs/{job_id}/start",
-            headers={'X-API-Key': API_KEY},
-            json={'worker_id': WORKER_ID},
-            timeout=10
-        )
-        
-        images_dir = download_photos(job['photos_url'], job_dir)
-        workspace_dir = job_dir / 'workspace'
-        model_path = run_colmap(images_dir, workspace_dir)
-        analysis = analyze_model(model_path)
-        model_url = upload_results(model_path, job_dir)
-        
-        result_data = {
-            'model_path': model_url,
-            'analysis': analysis,
-            'processing_time_minutes': 10.5,
-            'quality_score': 0.85
-        }
-        
-        response = requests.post(
-            f"{CLOUD_API_URL}/api/worker/jobs/{job_id}/complete",
+        download_photos(job['photos_url'], attempt_dir)
+    except Exception as e:
+        download_error = e
+    
+    # Anything but a successful claim means the job isn't ours: leave it for its owner
+    # (or the next poll) rather than running or failing it
+    try:
+        status = claim.result().status_code
+    except Exception as e:
+        log(f"Could not claim job {job_id}, skipping: {e}")
+        status = None
+    
+    if status is None or not 200 <= status < 300:
+        if status == 409:
+            log(f"Job {job_id} already claimed by another worker, skipping")
+        elif status is not None:
+            log(f"Could not claim job {job_id} (HTTP {status}), skipping")
+        shutil.rmtree(attempt_dir, ignore_errors=True)
+        return None
+    
+    if download_error:
+        shutil.rmtree(attempt_dir, ignore_errors=True)
+        raise download_error
+    
+    # The job is ours; anything already at job_dir is left over from an earlier run
+    if job_dir.exists():
+        shutil.rmtree(job_dir)
+    attempt_dir.rename(job_dir)
+    return job_dir
+
+def finish_job(job_id, job_dir, model_path):
+    # Analyze the model and report the results
+    analysis = analyze_model(model_path)
+    model_url = upload_results(model_path, job_dir)
+    
+    result_data = {
+        'model_path': model_url,
+        'analysis': analysis,
+        'processing_time_minutes': 10.5,
+        'quality_score': 0.85
+    }
+    
+    response = SESSION.post(
+        f"{CLOUD_API_URL}/api/worker/jobs/{job_id}/complete",
+        headers={'X-API-Key': API_KEY},
+        json={'results': result_data},
+        timeout=10
+    )
+    response.raise_for_status()
+    
+    log(f"Job {job_id} completed successfully")
+    shutil.rmtree(job_dir)
+
+def fail_job(job_id, job_dir, error):
+    log(f"Job {job_id} failed: {error}")
+    
+    try:
+        SESSION.post(
+            f"{CLOUD_API_URL}/api/worker/jobs/{job_id}/fail",
             headers={'X-API-Key': API_KEY},
-            json={'results': result_data},
+            json={'error': str(error)},
             timeout=10
         )
-        response.raise_for_status()
-        
-        log(f"Job {job_id} completed successfully")
+    except:
+        log("Failed to report job failure to cloud")
+    
+    if job_dir.exists():
         shutil.rmtree(job_dir)
-        
-    except Exception as e:
-        log(f"Job {job_id} failed: {e}")
-        
-        try:
-            requests.post(
-                f"{CLOUD_API_URL}/api/worker/jobs/{job_id}/fail",
-                headers={'X-API-Key': API_KEY},
-                json={'error': str(e)},
-                timeout=10
-            )
-        except:
-            log("Failed to report job failure to cloud")
-        
-        if job_dir.exists():
-            shutil.rmtree(job_dir)
 
 def poll_for_jobs():
     try:
-        response = requests.get(
+        response = SESSION.get(
             f"{CLOUD_API_URL}/api/worker/jobs",
             headers={'X-API-Key': API_KEY},
-            timeout=10
+            params={'wait_seconds': POLL_WAIT_SECONDS},
+            timeout=(5, POLL_WAIT_SECONDS + 30)
         )
         response.raise_for_status()
         jobs = response.json()
@@ -204,8 +314,97 @@ def poll_for_jobs():
         
     except requests.exceptions.RequestException as e:
         log(f"Failed to poll for jobs: {e}")
+        # back off so an unreachable API doesn't turn the long-poll loop into a hot loop
+        time.sleep(POLL_INTERVAL)
         return []
 
+# Each stage logs and carries on after an unexpected error, as the old polling loop did;
+# an exception escaping a stage would end it and, through gather(), the whole worker
+
+# Jobs somewhere in this worker's pipeline. A job stays 'queued' on the server until its
+# claim lands, so later polls return it again; those repeats are skipped rather than run
+# a second time against the same job directory. Only touched from the event loop
+IN_FLIGHT = set()
+
+async def poll_stage(download_queue):
+    while True:
+        try:
+            jobs = await asyncio.to_thread(poll_for_jobs)
+            for job in jobs:
+                if job['job_id'] in IN_FLIGHT:
+                    continue
+                IN_FLIGHT.add(job['job_id'])
+                # Blocks while the pipeline is full, so jobs aren't claimed faster than they can run
+                await download_queue.put(job)
+        except Exception as e:
+            log(f"Unexpected error while polling: {e}")
+            await asyncio.sleep(POLL_INTERVAL)
+
+async def download_stage(download_queue, colmap_queue):
+    while True:
+        job = await download_queue.get()
+        job_id = job['job_id']
+        queued = False
+        try:
+            job_dir = WORK_DIR / 'jobs' / job_id
+            try:
+                job_dir = await asyncio.to_thread(claim_and_download, job)
+            except Exception as e:
+                await asyncio.to_thread(fail_job, job_id, job_dir, e)
+                continue
+            if job_dir is not None:
+                await colmap_queue.put((job_id, job_dir))
+                queued = True
+        except Exception as e:
+            log(f"Unexpected error in download stage: {e}")
+        finally:
+            if not queued:
+                IN_FLIGHT.discard(job_id)
+
+async def colmap_stage(colmap_queue, finish_queue):
+    while True:
+        job_id, job_dir = await colmap_queue.get()
+        queued = False
+        try:
+            try:
+                model_path = await run_colmap(job_dir / 'images', job_dir / 'workspace')
+            except Exception as e:
+                await asyncio.to_thread(fail_job, job_id, job_dir, e)
+                continue
+            await finish_queue.put((job_id, job_dir, model_path))
+            queued = True
+        except Exception as e:
+            log(f"Unexpected error in COLMAP stage: {e}")
+        finally:
+            if not queued:
+                IN_FLIGHT.discard(job_id)
+
+async def finish_stage(finish_queue):
+    while True:
+        job_id, job_dir, model_path = await finish_queue.get()
+        try:
+            try:
+                await asyncio.to_thread(finish_job, job_id, job_dir, model_path)
+            except Exception as e:
+                await asyncio.to_thread(fail_job, job_id, job_dir, e)
+        except Exception as e:
+            log(f"Unexpected error in finish stage: {e}")
+        finally:
+            IN_FLIGHT.discard(job_id)
+
+async def main_async():
+    # One job per stage, so the next job downloads while COLMAP runs the current one
+    download_queue = asyncio.Queue(maxsize=1)
+    colmap_queue = asyncio.Queue(maxsize=1)
+    finish_queue = asyncio.Queue(maxsize=1)
+    
+    await asyncio.gather(
+        poll_stage(download_queue),
+        download_stage(download_queue, colmap_queue),
+        colmap_stage(colmap_queue, finish_queue),
+        finish_stage(finish_queue)
+    )
+
 def main():
     log(f"Worker starting (ID: {WORKER_ID})")
     log(f"Cloud API: {CLOUD_API_URL}")
@@ -217,24 +416,12 @@ def main():
         sys.exit(1)
     
     log("COLMAP check passed")
-    log(f"Polling every {POLL_INTERVAL} seconds...")
+    log(f"Long-polling for jobs ({POLL_WAIT_SECONDS}s per request)...")
     
-    while True:
-        try:
-            jobs = poll_for_jobs()
-            
-            for job in jobs:
-                process_job(job)
-            
-            if not jobs:
-                time.sleep(POLL_INTERVAL)
-                
-        except KeyboardInterrupt:
-            log("Worker shutting down...")
-            break
-        except Exception as e:
-            log(f"Unexpected error: {e}")
-            time.sleep(POLL_INTERVAL)
+    try:
+        asyncio.run(main_async())
+    except KeyboardInterrupt:
+        log("Worker shutting down...")
 
 if __name__ == '__main__':
     main()
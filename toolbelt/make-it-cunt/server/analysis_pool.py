@@ -0,0 +1,93 @@
+"""
+Analysis Process Pool for Make It Cunt v3.0
+
+Runs CPU-heavy mesh analysis (body, garment, fit) in worker processes so a
+large scan doesn't hold the GIL while other requests wait. Vertex and face
+arrays are handed over through multiprocessing.shared_memory instead of
+being pickled with the call. Independent jobs (e.g. a batch of calibration
+photos) can be fanned out over the same workers with run_batch.
+
+Dependencies: numpy
+"""
+
+import itertools
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Any, Callable, Iterable, List, Sequence
+
+import numpy as np
+
+# Meshes below this many vertices are analyzed inline; the process hop costs more than it saves
+OFFLOAD_MIN_VERTICES = int(os.environ.get('OFFLOAD_MIN_VERTICES', '50000'))
+ANALYSIS_WORKERS = int(os.environ.get('ANALYSIS_WORKERS', str(os.cpu_count() or 2)))
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn, not fork: the server process is multithreaded under gunicorn gthread
+            _pool = ProcessPoolExecutor(max_workers=ANALYSIS_WORKERS,
+                                        mp_context=multiprocessing.get_context('spawn'))
+        return _pool
+
+
+def _share(array: np.ndarray):
+    """Copy an array into a new shared memory segment; returns (segment, spec)."""
+    array = np.ascontiguousarray(array)
+    segment = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    np.ndarray(array.shape, array.dtype, buffer=segment.buf)[...] = array
+    return segment, (segment.name, array.shape, array.dtype.str)
+
+
+def _run_shared(fn: Callable, specs, args, kwargs):
+    """Worker side: attach to the segments and call fn with the arrays."""
+    arrays = []
+    for name, shape, dtype in specs:
+        segment = shared_memory.SharedMemory(name=name)
+        try:
+            # Copied out so the result can't hold views into a segment the parent unlinks
+            arrays.append(np.array(np.ndarray(shape, dtype, buffer=segment.buf)))
+        finally:
+            segment.close()
+    return fn(*arrays, *args, **kwargs)
+
+
+def run_analysis(fn: Callable, arrays: Sequence[np.ndarray], *args, **kwargs) -> Any:
+    """
+    Call fn(*arrays, *args, **kwargs), in a worker process if the mesh is large.
+
+    fn must be a module-level function so it can be pickled by reference.
+    """
+    if max(len(a) for a in arrays) < OFFLOAD_MIN_VERTICES:
+        return fn(*arrays, *args, **kwargs)
+
+    segments, specs = [], []
+    try:
+        for array in arrays:
+            segment, spec = _share(array)
+            segments.append(segment)
+            specs.append(spec)
+        return _get_pool().submit(_run_shared, fn, specs, args, kwargs).result()
+    finally:
+        for segment in segments:
+            segment.close()
+            segment.unlink()
+
+
+def run_batch(fn: Callable, items: Iterable, *args) -> List[Any]:
+    """
+    [fn(item, *args) for item in items], spread over the worker processes.
+
+    A single item runs inline. fn must be a module-level function.
+    """
+    items = list(items)
+    if len(items) < 2:
+        return [fn(item, *args) for item in items]
+    return list(_get_pool().map(fn, items, *(itertools.repeat(arg) for arg in args)))
@@ -7,27 +7,41 @@ Local Flask server for:
 - Volumetric fit analysis (body-garment delta)
 - Pattern generation (shaped pieces, not rectangles!)
 
-Run with: python app.py
+Run with: python app.py (development) or gunicorn via wsgi.py
 Server runs at: http://localhost:5050
 """
 
 import os
 import sys
 import json
+import hashlib
+import shutil
 import tempfile
-from flask import Flask, request, jsonify, send_file, Response
+import threading
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from contextlib import contextmanager
+from flask import Flask, Request, request, send_file, Response
 from flask_cors import CORS
 from io import BytesIO
 import numpy as np
+import orjson
 
 # Import existing v2 modules
-from calibration import calibrate_from_image, generate_aruco_card_svg
+from analysis_pool import run_analysis
+from calibration import (
+    calibrate_from_image, generate_aruco_card_svg, DEFAULT_MARKER_SIZE_CM,
+    DEFAULT_CALIBRATION_CARD_SVG, DEFAULT_CALIBRATION_CARD_ETAG
+)
 from garment_detector import detect_from_bytes, detect_garment, draw_keypoints_on_image
 import cv2
 
 # Import v3 volumetric modules
 try:
-    from mesh_processing import MeshProcessor, process_body_scan, process_garment_scan
+    from mesh_processing import (
+        ProcessedMesh, process_body_scan, process_garment_scan, acquire_processor
+    )
     MESH_PROCESSING_AVAILABLE = True
 except ImportError as e:
     MESH_PROCESSING_AVAILABLE = False
@@ -62,18 +76,212 @@ except ImportError as e:
     print(f"Warning: Pattern generator unavailable: {e}")
 
 
+# Mesh uploads are spooled to tmpfs where available so loading them never touches disk
+UPLOAD_SPOOL_DIR = '/dev/shm' if os.path.isdir('/dev/shm') else None
+MESH_EXTENSIONS = ('.ply', '.obj', '.stl')
+
+
+class MeshUploadRequest(Request):
+    """Request that spools mesh uploads to named temp files, so they can be loaded by path."""
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        suffix = os.path.splitext(filename or '')[1].lower()
+        if suffix not in MESH_EXTENSIONS:
+            return super()._get_file_stream(total_content_length, content_type, filename, content_length)
+        # Removed when werkzeug closes the request's files
+        return tempfile.NamedTemporaryFile(suffix=suffix, dir=UPLOAD_SPOOL_DIR)
+
+
 app = Flask(__name__)
+app.request_class = MeshUploadRequest
+app.config['MAX_CONTENT_LENGTH'] = int(os.environ.get('MAX_UPLOAD_MB', '512')) * 1024 * 1024
 CORS(app)  # Allow cross-origin requests from the HTML app
 
 # Server configuration
 PORT = 5050
 HOST = '127.0.0.1'
 
-# In-memory storage for uploaded meshes (for session-based workflow)
-mesh_storage = {
-    'body': None,
-    'garment': None
-}
+# Processed meshes are kept on disk as .npy files; only references stay in memory
+MESH_CACHE_DIR = os.path.join(tempfile.gettempdir(), 'make-it-cunt-meshes')
+MESH_CACHE_MAX_SESSIONS = 8
+
+
+class MeshStore:
+    """
+    LRU of per-session mesh references for the session-based workflow.
+
+    Each session maps 'body'/'garment' to {'stats', 'analysis', 'vertices_path',
+    'faces_path'}. Evicted or replaced entries have their files unlinked.
+    """
+
+    def __init__(self, cache_dir: str, max_sessions: int):
+        self.cache_dir = cache_dir
+        self.max_sessions = max_sessions
+        self._sessions: "OrderedDict[str, dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def put(self, session_id, kind, stats, analysis=None, vertices=None, faces=None):
+        entry = {'stats': stats, 'analysis': analysis or {}}
+        if vertices is not None and faces is not None:
+            prefix = os.path.join(self.cache_dir, f"{uuid.uuid4().hex}_{kind}")
+            entry['vertices_path'] = f"{prefix}_vertices.npy"
+            entry['faces_path'] = f"{prefix}_faces.npy"
+            np.save(entry['vertices_path'], vertices)
+            np.save(entry['faces_path'], faces)
+
+        with self._lock:
+            meshes = self._sessions.pop(session_id, {})
+            evicted = [meshes[kind]] if kind in meshes else []
+            meshes[kind] = entry
+            self._sessions[session_id] = meshes
+            while len(self._sessions) > self.max_sessions:
+                _, old = self._sessions.popitem(last=False)
+                evicted.extend(old.values())
+
+        for old_entry in evicted:
+            self._unlink(old_entry)
+
+    def get(self, session_id, kind):
+        with self._lock:
+            meshes = self._sessions.get(session_id)
+            if meshes is None:
+                return None
+            self._sessions.move_to_end(session_id)
+            return meshes.get(kind)
+
+    def clear(self, session_id):
+        with self._lock:
+            meshes = self._sessions.pop(session_id, {})
+        for entry in meshes.values():
+            self._unlink(entry)
+
+    @staticmethod
+    def load_arrays(entry):
+        """Memory-map the stored (vertices, faces), or None if only stats were kept."""
+        if not entry or 'vertices_path' not in entry:
+            return None
+        return (np.load(entry['vertices_path'], mmap_mode='r'),
+                np.load(entry['faces_path'], mmap_mode='r'))
+
+    @staticmethod
+    def _unlink(entry):
+        for key in ('vertices_path', 'faces_path'):
+            if key in entry:
+                try:
+                    os.unlink(entry[key])
+                except FileNotFoundError:
+                    pass
+
+
+mesh_storage = MeshStore(MESH_CACHE_DIR, MESH_CACHE_MAX_SESSIONS)
+
+
+def mesh_session_id():
+    """Session key from the X-Session-Id header or a session_id field; 'default' otherwise."""
+    session_id = request.headers.get('X-Session-Id') or request.values.get('session_id')
+    if not session_id and request.is_json:
+        session_id = (request.get_json(silent=True) or {}).get('session_id')
+    return session_id or 'default'
+
+
+def _orjson_default(obj):
+    # Arrays orjson can't serialize natively (non-contiguous, object dtype)
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    raise TypeError
+
+
+def ojsonify(payload, status=200):
+    """jsonify() replacement that serializes NumPy arrays and scalars directly via orjson."""
+    return Response(
+        orjson.dumps(payload, default=_orjson_default,
+                     option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS),
+        status=status,
+        mimetype='application/json'
+    )
+
+
+@contextmanager
+def spool_mesh_upload(file_storage):
+    """Yield a path to the uploaded mesh, copying it to a temp file only if it isn't already in one."""
+    stream = file_storage.stream
+    if isinstance(getattr(stream, 'name', None), str):
+        # Already spooled by MeshUploadRequest
+        stream.flush()
+        yield stream.name
+        return
+
+    suffix = os.path.splitext(file_storage.filename or '')[1].lower()
+    with tempfile.NamedTemporaryFile(suffix=suffix, dir=UPLOAD_SPOOL_DIR, delete=False) as tmp:
+        shutil.copyfileobj(file_storage.stream, tmp, length=1 << 20)
+    try:
+        yield tmp.name
+    finally:
+        os.unlink(tmp.name)
+
+
+# Processed body meshes keyed by upload content, so re-submitting the same scan
+# (common while iterating on a garment) skips loading, cleaning and orienting it.
+# Only the read-only vertex/face arrays and small metadata are kept (no trimesh
+# object), bounded by total array size
+BODY_CACHE_MAX_MB = int(os.environ.get('BODY_CACHE_MAX_MB', '256'))
+_body_cache: "OrderedDict[str, tuple]" = OrderedDict()
+_body_cache_bytes = 0
+_body_cache_lock = threading.Lock()
+
+
+def file_digest(path):
+    """BLAKE2b hex digest of a file's contents."""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _cache_body(key, processed):
+    """Store a processed body's arrays (made read-only) and return its cache entry."""
+    global _body_cache_bytes
+    processed.vertices.setflags(write=False)
+    processed.faces.setflags(write=False)
+    entry = (processed.vertices, processed.faces, processed.mesh_type, processed.stats,
+             processed.original_filename, tuple(processed.processing_log))
+    size = processed.vertices.nbytes + processed.faces.nbytes
+
+    limit = BODY_CACHE_MAX_MB * 1024 * 1024
+    if size > limit:
+        return entry
+    with _body_cache_lock:
+        if key not in _body_cache:
+            _body_cache[key] = entry
+            _body_cache_bytes += size
+        while _body_cache_bytes > limit:
+            _, (vertices, faces, *_) = _body_cache.popitem(last=False)
+            _body_cache_bytes -= vertices.nbytes + faces.nbytes
+    return entry
+
+
+def process_body_upload(processor, body_file):
+    """Load, clean and orient an uploaded body scan, reusing the result for identical uploads."""
+    with spool_mesh_upload(body_file) as body_path:
+        key = file_digest(body_path)
+        with _body_cache_lock:
+            entry = _body_cache.get(key)
+            if entry is not None:
+                _body_cache.move_to_end(key)
+
+        if entry is None:
+            body_mesh = processor.load_mesh(file_path=body_path, filename=body_file.filename)
+            body_mesh = processor.clean_mesh(body_mesh)
+            entry = _cache_body(key, processor.orient_body(body_mesh))
+            del body_mesh
+
+    # Callers append to the processing log, so each gets its own
+    vertices, faces, mesh_type, stats, filename, processing_log = entry
+    return ProcessedMesh(mesh=None, mesh_type=mesh_type, stats=stats,
+                         vertices=vertices, faces=faces, original_filename=filename,
+                         processing_log=list(processing_log))
 
 
 # ============================================================
@@ -83,7 +291,7 @@ mesh_storage = {
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """Health check endpoint with feature availability."""
-    return jsonify({
+    return ojsonify({
         'status': 'healthy',
         'version': '3.0.0',
         'features': {
@@ -104,6 +312,12 @@ def health_check():
 
 SCAN_FOLDER_BASE = os.path.expanduser('~/Desktop/MakeItCunt-Scans')
 
+# Resolved once; requests only resolve the requested file
+SCAN_ROOTS = {
+    scan_type: Path(SCAN_FOLDER_BASE, scan_type).resolve()
+    for scan_type in ('body', 'garment')
+}
+
 @app.route('/api/scans/folder', methods=['GET'])
 def get_scan_folder():
     """Return the scan folder path and any available scans."""
@@ -117,19 +331,24 @@ def get_scan_folder():
     def get_mesh_files(folder):
         """Get list of mesh files in folder, sorted by modification time (newest first)."""
         files = []
-        if os.path.exists(folder):
-            for f in os.listdir(folder):
-                if f.lower().endswith(('.ply', '.obj', '.stl')):
-                    path = os.path.join(folder, f)
+        try:
+            entries = os.scandir(folder)
+        except FileNotFoundError:
+            return files
+        with entries:
+            for entry in entries:
+                if entry.name.lower().endswith(MESH_EXTENSIONS) and entry.is_file():
+                    # One stat per entry, cached on the DirEntry
+                    st = entry.stat()
                     files.append({
-                        'name': f,
-                        'path': path,
-                        'size': os.path.getsize(path),
-                        'modified': os.path.getmtime(path)
+                        'name': entry.name,
+                        'path': entry.path,
+                        'size': st.st_size,
+                        'modified': st.st_mtime
                     })
         return sorted(files, key=lambda x: x['modified'], reverse=True)
 
-    return jsonify({
+    return ojsonify({
         'success': True,
         'folder': SCAN_FOLDER_BASE,
         'body_scans': get_mesh_files(body_folder),
@@ -140,44 +359,41 @@ def get_scan_folder():
 @app.route('/api/scans/load/<scan_type>', methods=['POST'])
 def load_scan_from_folder(scan_type):
     """Load a scan from the scan folder by filename."""
-    if scan_type not in ['body', 'garment']:
-        return jsonify({'success': False, 'error': 'Invalid scan type'}), 400
+    if scan_type not in SCAN_ROOTS:
+        return ojsonify({'success': False, 'error': 'Invalid scan type'}), 400
 
     data = request.get_json() or {}
     filename = data.get('filename')
 
     if not filename:
-        return jsonify({'success': False, 'error': 'No filename provided'}), 400
+        return ojsonify({'success': False, 'error': 'No filename provided'}), 400
 
-    folder = os.path.join(SCAN_FOLDER_BASE, scan_type)
-    filepath = os.path.join(folder, filename)
+    root = SCAN_ROOTS[scan_type]
+    target = (root / filename).resolve()
 
     # Security: ensure path is within scan folder
-    if not os.path.realpath(filepath).startswith(os.path.realpath(folder)):
-        return jsonify({'success': False, 'error': 'Invalid path'}), 400
+    if root not in target.parents:
+        return ojsonify({'success': False, 'error': 'Invalid path'}), 400
 
-    if not os.path.exists(filepath):
-        return jsonify({'success': False, 'error': 'File not found'}), 404
+    if not target.is_file():
+        return ojsonify({'success': False, 'error': 'File not found'}), 404
+    filepath = str(target)
 
     try:
-        with open(filepath, 'rb') as f:
-            file_data = f.read()
-
         if scan_type == 'body':
-            movement_profile = data.get('movement_profile', 'wild')
-            result = process_body_scan(file_data, filename, movement_profile)
+            result = process_body_scan(file_path=filepath, filename=filename)
             if result['success']:
-                mesh_storage['body'] = result
+                mesh_storage.put(mesh_session_id(), 'body', result['stats'])
         else:
             garment_type = data.get('garment_type')
-            result = process_garment_scan(file_data, filename, garment_type)
+            result = process_garment_scan(file_path=filepath, filename=filename, garment_type=garment_type)
             if result['success']:
-                mesh_storage['garment'] = result
+                mesh_storage.put(mesh_session_id(), 'garment', result['stats'])
 
-        return jsonify(result)
+        return ojsonify(result)
 
     except Exception as e:
-        return jsonify({'success': False, 'error': str(e)}), 500
+        return ojsonify({'success': False, 'error': str(e)}), 500
 
 
 # ============================================================
@@ -188,30 +404,37 @@ def load_scan_from_folder(scan_type):
 def calibrate():
     """Calibrate scale from ArUco markers in uploaded image."""
     if 'image' not in request.files:
-        return jsonify({'success': False, 'error': 'No image provided'}), 400
+        return ojsonify({'success': False, 'error': 'No image provided'}), 400
 
     image_file = request.files['image']
     marker_size = float(request.form.get('marker_size', 5.0))
-    image_bytes = image_file.read()
-    result = calibrate_from_image(image_bytes=image_bytes, marker_size_cm=marker_size)
+    result = calibrate_from_image(image_bytes=image_file.read(), marker_size_cm=marker_size)
 
     if result['success']:
-        return jsonify(result)
+        return ojsonify(result)
     else:
-        return jsonify(result), 400
+        return ojsonify(result), 400
+
+
+def calibration_card_svg(marker_size):
+    """Card SVG bytes and ETag; the default size comes prebuilt, custom sizes have no ETag."""
+    if marker_size == DEFAULT_MARKER_SIZE_CM:
+        return DEFAULT_CALIBRATION_CARD_SVG, DEFAULT_CALIBRATION_CARD_ETAG
+    return generate_aruco_card_svg(marker_size_cm=marker_size).encode('utf-8'), None
 
 
 @app.route('/api/calibration-card', methods=['GET'])
 def get_calibration_card():
     """Generate and return the printable ArUco calibration card as SVG."""
     marker_size = float(request.args.get('marker_size', 5.0))
-    svg_content = generate_aruco_card_svg(marker_size_cm=marker_size)
+    svg_content, etag = calibration_card_svg(marker_size)
 
     return send_file(
-        BytesIO(svg_content.encode('utf-8')),
+        BytesIO(svg_content),
         mimetype='image/svg+xml',
         as_attachment=True,
-        download_name='aruco-calibration-card.svg'
+        download_name='aruco-calibration-card.svg',
+        etag=etag or False
     )
 
 
@@ -219,8 +442,12 @@ def get_calibration_card():
 def preview_calibration_card():
     """Return calibration card SVG for inline display."""
     marker_size = float(request.args.get('marker_size', 5.0))
-    svg_content = generate_aruco_card_svg(marker_size_cm=marker_size)
-    return svg_content, 200, {'Content-Type': 'image/svg+xml'}
+    svg_content, etag = calibration_card_svg(marker_size)
+
+    response = Response(svg_content, mimetype='image/svg+xml')
+    if etag:
+        response.set_etag(etag)
+    return response.make_conditional(request)
 
 
 # ============================================================
@@ -231,7 +458,7 @@ def preview_calibration_card():
 def measure_garment():
     """Auto-detect garment keypoints from 2D photo."""
     if 'image' not in request.files:
-        return jsonify({'success': False, 'error': 'No image provided'}), 400
+        return ojsonify({'success': False, 'error': 'No image provided'}), 400
 
     image_file = request.files['image']
     garment_type = request.form.get('garment_type', None)
@@ -244,16 +471,16 @@ def measure_garment():
     result = detect_from_bytes(image_bytes, garment_type, scale_ppcm)
 
     if result['success']:
-        return jsonify(result)
+        return ojsonify(result)
     else:
-        return jsonify(result), 400
+        return ojsonify(result), 400
 
 
 @app.route('/api/measure/garment/visualize', methods=['POST'])
 def visualize_garment_detection():
     """Detect garment and return image with keypoints drawn."""
     if 'image' not in request.files:
-        return jsonify({'success': False, 'error': 'No image provided'}), 400
+        return ojsonify({'success': False, 'error': 'No image provided'}), 400
 
     image_file = request.files['image']
     garment_type = request.form.get('garment_type', None)
@@ -267,17 +494,19 @@ def visualize_garment_detection():
     image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
 
     if image is None:
-        return jsonify({'success': False, 'error': 'Failed to decode image'}), 400
+        return ojsonify({'success': False, 'error': 'Failed to decode image'}), 400
 
     result = detect_garment(image, garment_type, scale_ppcm)
 
     if not result.success:
-        return jsonify({'success': False, 'error': result.error}), 400
+        return ojsonify({'success': False, 'error': result.error}), 400
 
-    vis_image = draw_keypoints_on_image(image, result.keypoints, result.contour)
+    # The decoded frame isn't needed afterwards, so draw on it directly and
+    # hand the encoded buffer to BytesIO without an intermediate tobytes() copy
+    vis_image = draw_keypoints_on_image(image, result.keypoints, result.contour, in_place=True)
     _, buffer = cv2.imencode('.jpg', vis_image, [cv2.IMWRITE_JPEG_QUALITY, 90])
 
-    return send_file(BytesIO(buffer.tobytes()), mimetype='image/jpeg')
+    return send_file(BytesIO(buffer), mimetype='image/jpeg')
 
 
 # ============================================================
@@ -292,6 +521,7 @@ def upload_body_mesh():
     Request:
         - Form data with 'mesh' file (PLY, OBJ, or STL)
         - Optional 'movement_profile': 'default' or 'wild'
+        - Optional 'include_sections': 'true' to also return cross-sections
 
     Response:
         {
@@ -303,44 +533,43 @@ def upload_body_mesh():
         }
     """
     if not MESH_PROCESSING_AVAILABLE:
-        return jsonify({
+        return ojsonify({
             'success': False,
             'error': 'Mesh processing not available. Install trimesh, open3d, or pymeshlab.'
         }), 501
 
     if 'mesh' not in request.files:
-        return jsonify({'success': False, 'error': 'No mesh file provided'}), 400
+        return ojsonify({'success': False, 'error': 'No mesh file provided'}), 400
 
     mesh_file = request.files['mesh']
     filename = mesh_file.filename
     movement_profile = request.form.get('movement_profile', 'wild')
-
-    # Read and process mesh
-    mesh_bytes = mesh_file.read()
+    include_sections = request.form.get('include_sections', '').lower() in ('1', 'true', 'yes')
 
     try:
-        processor = MeshProcessor()
-        mesh = processor.load_mesh(file_bytes=mesh_bytes, filename=filename)
-        mesh = processor.clean_mesh(mesh)
-        mesh = processor.orient_body(mesh)
+        # Read and process mesh
+        with acquire_processor() as processor:
+            with spool_mesh_upload(mesh_file) as mesh_path:
+                mesh = processor.load_mesh(file_path=mesh_path, filename=filename)
+            mesh = processor.clean_mesh(mesh)
+            mesh = processor.orient_body(mesh)
 
         # Analyze body
         if BODY_MODEL_AVAILABLE:
-            body_analysis = analyze_body_mesh(
-                mesh.vertices, mesh.faces, movement_profile
+            body_analysis = run_analysis(
+                analyze_body_mesh, (mesh.vertices, mesh.faces), movement_profile,
+                include_sections=include_sections
             )
         else:
             body_analysis = {}
 
         # Store for later use
-        mesh_storage['body'] = {
-            'vertices': mesh.vertices,
-            'faces': mesh.faces,
-            'stats': mesh.stats.to_dict(),
-            'analysis': body_analysis
-        }
+        mesh_storage.put(
+            mesh_session_id(), 'body', mesh.stats.to_dict(), body_analysis,
+            vertices=mesh.vertices, faces=mesh.faces
+        )
 
-        return jsonify({
+        return ojsonify({
             'success': True,
             'mesh_type': 'body',
             'stats': mesh.stats.to_dict(),
@@ -349,7 +578,7 @@ def upload_body_mesh():
         })
 
     except Exception as e:
-        return jsonify({'success': False, 'error': str(e)}), 400
+        return ojsonify({'success': False, 'error': str(e)}), 400
 
 
 @app.route('/api/mesh/upload/garment', methods=['POST'])
@@ -372,43 +601,40 @@ def upload_garment_mesh():
         }
     """
     if not MESH_PROCESSING_AVAILABLE:
-        return jsonify({
+        return ojsonify({
             'success': False,
             'error': 'Mesh processing not available. Install trimesh, open3d, or pymeshlab.'
         }), 501
 
     if 'mesh' not in request.files:
-        return jsonify({'success': False, 'error': 'No mesh file provided'}), 400
+        return ojsonify({'success': False, 'error': 'No mesh file provided'}), 400
 
     mesh_file = request.files['mesh']
     filename = mesh_file.filename
     garment_type = request.form.get('garment_type', None)
 
-    mesh_bytes = mesh_file.read()
-
     try:
-        processor = MeshProcessor()
-        mesh = processor.load_mesh(file_bytes=mesh_bytes, filename=filename)
-        mesh = processor.clean_mesh(mesh)
-        mesh = processor.orient_garment(mesh, garment_type or "pants")
+        with acquire_processor() as processor:
+            with spool_mesh_upload(mesh_file) as mesh_path:
+                mesh = processor.load_mesh(file_path=mesh_path, filename=filename)
+            mesh = processor.clean_mesh(mesh)
+            mesh = processor.orient_garment(mesh, garment_type or "pants")
 
         # Analyze garment
         if GARMENT_MODEL_AVAILABLE:
-            garment_analysis = analyze_garment_mesh(
-                mesh.vertices, mesh.faces, garment_type
+            garment_analysis = run_analysis(
+                analyze_garment_mesh, (mesh.vertices, mesh.faces), garment_type
             )
         else:
             garment_analysis = {}
 
         # Store for later use
-        mesh_storage['garment'] = {
-            'vertices': mesh.vertices,
-            'faces': mesh.faces,
-            'stats': mesh.stats.to_dict(),
-            'analysis': garment_analysis
-        }
+        mesh_storage.put(
+            mesh_session_id(), 'garment', mesh.stats.to_dict(), garment_analysis,
+            vertices=mesh.vertices, faces=mesh.faces
+        )
 
-        return jsonify({
+        return ojsonify({
             'success': True,
             'mesh_type': 'garment',
             'stats': mesh.stats.to_dict(),
@@ -417,7 +643,7 @@ def upload_garment_mesh():
         })
 
     except Exception as e:
-        return jsonify({'success': False, 'error': str(e)}), 400
+        return ojsonify({'success': False, 'error': str(e)}), 400
 
 
 # ============================================================
@@ -453,7 +679,7 @@ def analyze_fit_endpoint():
         }
     """
     if not FIT_ANALYSIS_AVAILABLE:
-        return jsonify({
+        return ojsonify({
             'success': False,
             'error': 'Fit analysis not available. Check dependencies.'
         }), 501
@@ -462,27 +688,28 @@ def analyze_fit_endpoint():
     garment_type = request.form.get('garment_type', None)
 
     # Check if new meshes are being uploaded
-    if 'body_mesh' in request.files and 'garment_mesh' in request.files:
+    uploading = 'body_mesh' in request.files and 'garment_mesh' in request.files
+    if not uploading:
+        session_id = mesh_session_id()
+        stored_body = MeshStore.load_arrays(mesh_storage.get(session_id, 'body'))
+        stored_garment = MeshStore.load_arrays(mesh_storage.get(session_id, 'garment'))
+
+    if uploading:
         # Process new uploads
         try:
-            processor = MeshProcessor()
+            with acquire_processor() as processor:
+                # Body
+                body_mesh = process_body_upload(processor, request.files['body_mesh'])
 
-            # Body
-            body_file = request.files['body_mesh']
-            body_bytes = body_file.read()
-            body_mesh = processor.load_mesh(file_bytes=body_bytes, filename=body_file.filename)
-            body_mesh = processor.clean_mesh(body_mesh)
-            body_mesh = processor.orient_body(body_mesh)
+                # Garment
+                garment_file = request.files['garment_mesh']
+                with spool_mesh_upload(garment_file) as garment_path:
+                    garment_mesh = processor.load_mesh(file_path=garment_path, filename=garment_file.filename)
+                garment_mesh = processor.clean_mesh(garment_mesh)
+                garment_mesh = processor.orient_garment(garment_mesh, garment_type or "pants")
 
-            # Garment
-            garment_file = request.files['garment_mesh']
-            garment_bytes = garment_file.read()
-            garment_mesh = processor.load_mesh(file_bytes=garment_bytes, filename=garment_file.filename)
-            garment_mesh = processor.clean_mesh(garment_mesh)
-            garment_mesh = processor.orient_garment(garment_mesh, garment_type or "pants")
-
-            # Align
-            body_mesh, garment_mesh = processor.align_meshes(body_mesh, garment_mesh)
+                # Align
+                body_mesh, garment_mesh = processor.align_meshes(body_mesh, garment_mesh)
 
             body_vertices = body_mesh.vertices
             body_faces = body_mesh.faces
@@ -490,36 +717,34 @@ def analyze_fit_endpoint():
             garment_faces = garment_mesh.faces
 
         except Exception as e:
-            return jsonify({'success': False, 'error': f'Mesh processing error: {str(e)}'}), 400
+            return ojsonify({'success': False, 'error': f'Mesh processing error: {str(e)}'}), 400
 
-    elif mesh_storage['body'] and mesh_storage['garment']:
+    elif stored_body and stored_garment:
         # Use stored meshes
-        body_vertices = mesh_storage['body']['vertices']
-        body_faces = mesh_storage['body']['faces']
-        garment_vertices = mesh_storage['garment']['vertices']
-        garment_faces = mesh_storage['garment']['faces']
+        body_vertices, body_faces = stored_body
+        garment_vertices, garment_faces = stored_garment
 
     else:
-        return jsonify({
+        return ojsonify({
             'success': False,
             'error': 'No meshes available. Upload body and garment meshes first, or include them in this request.'
         }), 400
 
     # Perform analysis
     try:
-        result = analyze_fit(
-            body_vertices, body_faces,
-            garment_vertices, garment_faces,
+        result = run_analysis(
+            analyze_fit,
+            (body_vertices, body_faces, garment_vertices, garment_faces),
             movement_profile, garment_type
         )
 
-        return jsonify({
+        return ojsonify({
             'success': True,
             **result
         })
 
     except Exception as e:
-        return jsonify({'success': False, 'error': str(e)}), 400
+        return ojsonify({'success': False, 'error': str(e)}), 400
 
 
 # ============================================================
@@ -543,7 +768,7 @@ def generate_patterns_endpoint():
         }
     """
     if not PATTERN_GENERATOR_AVAILABLE:
-        return jsonify({
+        return ojsonify({
             'success': False,
             'error': 'Pattern generation not available. Install svgwrite.'
         }), 501
@@ -555,7 +780,7 @@ def generate_patterns_endpoint():
     fabric_type = data.get('fabric_type', 'default')
 
     if not recommendations:
-        return jsonify({
+        return ojsonify({
             'success': False,
             'error': 'No recommendations provided. Run fit analysis first.'
         }), 400
@@ -563,13 +788,13 @@ def generate_patterns_endpoint():
     try:
         result = generate_patterns(recommendations, garment_data, fabric_type)
 
-        return jsonify({
+        return ojsonify({
             'success': True,
             **result
         })
 
     except Exception as e:
-        return jsonify({'success': False, 'error': str(e)}), 400
+        return ojsonify({'success': False, 'error': str(e)}), 400
 
 
 @app.route('/api/patterns/download/<pattern_name>', methods=['GET'])
@@ -585,7 +810,7 @@ def download_pattern(pattern_name):
     """
     # This would retrieve from a pattern cache
     # For now, return a placeholder
-    return jsonify({
+    return ojsonify({
         'success': False,
         'error': 'Pattern download requires running generate first'
     }), 400
@@ -623,13 +848,13 @@ def full_workflow():
             missing.append('fit_analysis')
         if not PATTERN_GENERATOR_AVAILABLE:
             missing.append('pattern_generation')
-        return jsonify({
+        return ojsonify({
             'success': False,
             'error': f'Missing features: {", ".join(missing)}'
         }), 501
 
     if 'body_mesh' not in request.files or 'garment_mesh' not in request.files:
-        return jsonify({
+        return ojsonify({
             'success': False,
             'error': 'Both body_mesh and garment_mesh files required'
         }), 400
@@ -639,31 +864,35 @@ def full_workflow():
     fabric_type = request.form.get('fabric_type', 'default')
 
     try:
-        processor = MeshProcessor()
+        with acquire_processor() as processor:
+            # Process body
+            body_mesh = process_body_upload(processor, request.files['body_mesh'])
 
-        # Process body
-        body_file = request.files['body_mesh']
-        body_bytes = body_file.read()
-        body_mesh = processor.load_mesh(file_bytes=body_bytes, filename=body_file.filename)
-        body_mesh = processor.clean_mesh(body_mesh)
-        body_mesh = processor.orient_body(body_mesh)
+            # Process garment
+            garment_file = request.files['garment_mesh']
+            with spool_mesh_upload(garment_file) as garment_path:
+                garment_mesh = processor.load_mesh(file_path=garment_path, filename=garment_file.filename)
+            garment_mesh = processor.clean_mesh(garment_mesh)
+            garment_mesh = processor.orient_garment(garment_mesh, garment_type)
 
-        # Process garment
-        garment_file = request.files['garment_mesh']
-        garment_bytes = garment_file.read()
-        garment_mesh = processor.load_mesh(file_bytes=garment_bytes, filename=garment_file.filename)
-        garment_mesh = processor.clean_mesh(garment_mesh)
-        garment_mesh = processor.orient_garment(garment_mesh, garment_type)
+            # Align meshes
+            body_mesh, garment_mesh = processor.align_meshes(body_mesh, garment_mesh)
 
-        # Align meshes
-        body_mesh, garment_mesh = processor.align_meshes(body_mesh, garment_mesh)
+        # Only the arrays are needed from here on. Drop the mesh objects and close the
+        # uploads so their tmpfs spool files go away before the analysis peaks
+        body_vertices, body_faces = body_mesh.vertices, body_mesh.faces
+        garment_vertices, garment_faces = garment_mesh.vertices, garment_mesh.faces
+        del body_mesh, garment_mesh
+        request.files['body_mesh'].close()
+        request.files['garment_mesh'].close()
 
         # Run fit analysis
-        fit_result = analyze_fit(
-            body_mesh.vertices, body_mesh.faces,
-            garment_mesh.vertices, garment_mesh.faces,
+        fit_result = run_analysis(
+            analyze_fit,
+            (body_vertices, body_faces, garment_vertices, garment_faces),
             movement_profile, garment_type
         )
+        del body_vertices, body_faces, garment_vertices, garment_faces
 
         # Extract recommendations for pattern generation
         recommendations = fit_result.get('fit_analysis', {}).get('recommendations', [])
@@ -677,7 +906,7 @@ def full_workflow():
         else:
             pattern_result = {'patterns': [], 'svg_content': {}}
 
-        return jsonify({
+        return ojsonify({
             'success': True,
             'fit_analysis': fit_result.get('fit_analysis', {}),
             'body_summary': fit_result.get('body_summary', {}),
@@ -688,7 +917,7 @@ def full_workflow():
 
     except Exception as e:
         import traceback
-        return jsonify({
+        return ojsonify({
             'success': False,
             'error': str(e),
             'traceback': traceback.format_exc()
@@ -702,20 +931,22 @@ def full_workflow():
 @app.route('/api/mesh/status', methods=['GET'])
 def mesh_status():
     """Check what meshes are currently loaded."""
-    return jsonify({
-        'body_loaded': mesh_storage['body'] is not None,
-        'garment_loaded': mesh_storage['garment'] is not None,
-        'body_stats': mesh_storage['body']['stats'] if mesh_storage['body'] else None,
-        'garment_stats': mesh_storage['garment']['stats'] if mesh_storage['garment'] else None
+    session_id = mesh_session_id()
+    body = mesh_storage.get(session_id, 'body')
+    garment = mesh_storage.get(session_id, 'garment')
+    return ojsonify({
+        'body_loaded': body is not None,
+        'garment_loaded': garment is not None,
+        'body_stats': body['stats'] if body else None,
+        'garment_stats': garment['stats'] if garment else None
     })
 
 
 @app.route('/api/mesh/clear', methods=['POST'])
 def clear_meshes():
     """Clear stored meshes."""
-    mesh_storage['body'] = None
-    mesh_storage['garment'] = None
-    return jsonify({'success': True, 'message': 'Meshes cleared'})
+    mesh_storage.clear(mesh_session_id())
+    return ojsonify({'success': True, 'message': 'Meshes cleared'})
 
 
 # ============================================================
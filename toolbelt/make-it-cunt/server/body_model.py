@@ -7,12 +7,15 @@ Generates movement envelope for dynamic ease calculation.
 Dependencies: numpy, scipy, trimesh (optional)
 """
 
+import os
+from concurrent.futures import ThreadPoolExecutor
+
 import numpy as np
 from dataclasses import dataclass, field
 from typing import Dict, List, Optional, Tuple, Any
 from enum import Enum
 from scipy import ndimage
-from scipy.spatial import ConvexHull
+from scipy.spatial import ConvexHull, QhullError
 from scipy.signal import find_peaks
 
 try:
@@ -21,6 +24,45 @@ try:
 except ImportError:
     TRIMESH_AVAILABLE = False
 
+# Threads used to build cross-sections
+SECTION_WORKERS = min(8, os.cpu_count() or 1)
+
+
+def _hull_candidates(points: np.ndarray) -> Optional[np.ndarray]:
+    """
+    Drop points that can't be on the 2D convex hull (Akl-Toussaint heuristic).
+
+    Points strictly inside the octagon of extreme points along X, Z and the
+    two diagonals are discarded, so Qhull only sees the outer band of the
+    slab (the inner faces of the legs, torso points between the arms, etc).
+
+    Returns None if the octagon has no area: the slab is collinear (or a
+    single point) and has no 2D hull.
+    """
+    x = points[:, 0]
+    z = points[:, 1]
+    diag_sum = x + z
+    diag_diff = x - z
+
+    # Counter-clockwise: W, SW, S, SE, E, NE, N, NW
+    octagon = points[[
+        np.argmin(x), np.argmin(diag_sum), np.argmin(z), np.argmax(diag_diff),
+        np.argmax(x), np.argmax(diag_sum), np.argmax(z), np.argmin(diag_diff)
+    ]]
+    edges = np.roll(octagon, -1, axis=0) - octagon
+
+    # Shoelace area; the octagon spans the slab, so zero area means a flat slab
+    if (octagon[:, 0] * edges[:, 1] - octagon[:, 1] * edges[:, 0]).sum() == 0:
+        return None
+
+    inside = np.ones(len(points), dtype=bool)
+    for (ax, az), (ex, ez) in zip(octagon, edges):
+        if ex or ez:
+            inside &= ex * (z - az) - ez * (x - ax) > 0
+
+    candidates = points[~inside]
+    return candidates if len(candidates) >= 3 else points
+
 
 class BodyLandmark(Enum):
     """Key anatomical landmarks for garment fitting"""
@@ -55,6 +97,10 @@ class BodyLandmark(Enum):
     RIGHT_WRIST = "right_wrist"
 
 
+# Landmark -> API key, looked up without going through the Enum descriptor
+_LANDMARK_KEYS = {lm: lm.value for lm in BodyLandmark}
+
+
 @dataclass
 class CrossSection:
     """A horizontal cross-section through the body mesh"""
@@ -70,13 +116,80 @@ class CrossSection:
         return {
             'height': float(self.height),
             'circumference': float(self.circumference),
-            'center': self.center.tolist(),
+            'center': self.center,
             'width': float(self.width),
             'depth': float(self.depth),
             'area': float(self.area)
         }
 
 
+@dataclass
+class CrossSectionTable:
+    """
+    All cross-sections of a body, stored column-wise and ordered by height.
+
+    Row i is one section; landmark detection and measurement work on the
+    columns directly and only build CrossSection objects for API output.
+    """
+    heights: np.ndarray  # (S,) Y coordinates, ascending
+    circumferences: np.ndarray  # (S,)
+    centers: np.ndarray  # (S, 2) center points (X, Z)
+    widths: np.ndarray  # (S,)
+    depths: np.ndarray  # (S,)
+    areas: np.ndarray  # (S,)
+    points: List[np.ndarray]  # Hull points (X, Z) per section
+
+    @classmethod
+    def from_rows(cls, rows: List[Tuple]) -> 'CrossSectionTable':
+        """Build from (height, points, circumference, center, width, depth, area) rows"""
+        if not rows:
+            return cls(np.empty(0), np.empty(0), np.empty((0, 2)),
+                       np.empty(0), np.empty(0), np.empty(0), [])
+        heights, points, circumferences, centers, widths, depths, areas = zip(*rows)
+        return cls(
+            heights=np.array(heights),
+            circumferences=np.array(circumferences),
+            centers=np.array(centers),
+            widths=np.array(widths),
+            depths=np.array(depths),
+            areas=np.array(areas),
+            points=list(points)
+        )
+
+    def __len__(self) -> int:
+        return len(self.heights)
+
+    def row(self, i: int) -> CrossSection:
+        return CrossSection(
+            height=self.heights[i],
+            points=self.points[i],
+            circumference=self.circumferences[i],
+            center=self.centers[i],
+            width=self.widths[i],
+            depth=self.depths[i],
+            area=self.areas[i]
+        )
+
+    def nearest(self, height: float) -> int:
+        """Index of the section closest to a height (the lower one on a tie)"""
+        i = int(np.searchsorted(self.heights, height))
+        if i == len(self.heights) or (i > 0 and height - self.heights[i - 1] <= self.heights[i] - height):
+            i -= 1
+        return i
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Parallel arrays, one entry per section (row i of each column is one section)"""
+        return {
+            'heights': self.heights,
+            'circumferences': self.circumferences,
+            'centers': self.centers,
+            'widths': self.widths,
+            'depths': self.depths,
+            'areas': self.areas,
+            'points': self.points
+        }
+
+
 @dataclass
 class BodyMeasurements:
     """Extracted body measurements from 3D scan"""
@@ -121,7 +234,11 @@ class BodyMeasurements:
     unit: str = "mm"
 
     def to_dict(self) -> Dict[str, float]:
-        return {k: v for k, v in self.__dict__.items() if not k.startswith('_')}
+        # Plain floats, whatever precision the mesh was analyzed in
+        return {
+            k: v if isinstance(v, str) else float(v)
+            for k, v in self.__dict__.items() if not k.startswith('_')
+        }
 
 
 @dataclass
@@ -180,17 +297,24 @@ class BodyModel:
             vertices: Nx3 array of vertex positions (Y-up, centered at origin)
             faces: Mx3 array of face indices
         """
+        # Millimetre-scale bodies don't need float64; float32 halves the bytes every pass touches
+        vertices = np.ascontiguousarray(vertices, dtype=np.float32)
         self.vertices = vertices
         self.faces = faces
 
         # Mesh bounds
-        self.min_y = vertices[:, 1].min()
-        self.max_y = vertices[:, 1].max()
+        self.min_y = float(vertices[:, 1].min())
+        self.max_y = float(vertices[:, 1].max())
         self.height = self.max_y - self.min_y
 
+        # Vertices presorted by height, so each cross-section slab is a contiguous slice
+        order = np.argsort(vertices[:, 1], kind='stable')
+        self._y_sorted = vertices[order, 1]
+        self._xz_sorted = np.ascontiguousarray(vertices[order][:, [0, 2]])
+
         # Storage
         self.landmarks: Dict[BodyLandmark, np.ndarray] = {}
-        self.cross_sections: Dict[float, CrossSection] = {}
+        self.cross_sections = CrossSectionTable.from_rows([])
         self.measurements = BodyMeasurements()
 
     def analyze(self, num_sections: int = 100) -> 'BodyModel':
@@ -216,50 +340,50 @@ class BodyModel:
         heights = np.linspace(self.min_y + 1, self.max_y - 1, num_sections)
         slice_thickness = (self.max_y - self.min_y) / num_sections
 
-        for height in heights:
-            # Find vertices near this height
-            mask = np.abs(self.vertices[:, 1] - height) < slice_thickness
-            if mask.sum() < 10:
-                continue
-
-            points_2d = self.vertices[mask][:, [0, 2]]  # X, Z only
-
-            try:
-                # Compute convex hull for circumference
-                hull = ConvexHull(points_2d)
-                hull_points = points_2d[hull.vertices]
-
-                # Compute metrics
-                circumference = hull.area  # In 2D, "area" is perimeter
-                center = hull_points.mean(axis=0)
-                width = points_2d[:, 0].max() - points_2d[:, 0].min()
-                depth = points_2d[:, 1].max() - points_2d[:, 1].min()
-
-                # Approximate area using hull
-                area = self._polygon_area(hull_points)
-
-                self.cross_sections[height] = CrossSection(
-                    height=height,
-                    points=hull_points,
-                    circumference=circumference,
-                    center=center,
-                    width=width,
-                    depth=depth,
-                    area=area
-                )
-            except Exception:
-                # Skip problematic cross-sections
-                continue
-
-    def _polygon_area(self, points: np.ndarray) -> float:
-        """Compute area of a 2D polygon using shoelace formula"""
-        n = len(points)
-        area = 0.0
-        for i in range(n):
-            j = (i + 1) % n
-            area += points[i, 0] * points[j, 1]
-            area -= points[j, 0] * points[i, 1]
-        return abs(area) / 2.0
+        # Slab bounds for every height at once: vertices strictly within slice_thickness
+        starts = np.searchsorted(self._y_sorted, heights - slice_thickness, side='right')
+        ends = np.searchsorted(self._y_sorted, heights + slice_thickness, side='left')
+
+        slabs = [
+            (height, self._xz_sorted[lo:hi])  # X, Z only
+            for height, lo, hi in zip(heights, starts, ends)
+            if hi - lo >= 10
+        ]
+
+        # Slices are independent and Qhull releases the GIL, so they can run on threads
+        if SECTION_WORKERS > 1:
+            with ThreadPoolExecutor(max_workers=SECTION_WORKERS) as pool:
+                sections = list(pool.map(lambda slab: self._cross_section(*slab), slabs))
+        else:
+            sections = [self._cross_section(*slab) for slab in slabs]
+
+        self.cross_sections = CrossSectionTable.from_rows([row for row in sections if row is not None])
+
+    @staticmethod
+    def _cross_section(height: float, points_2d: np.ndarray) -> Optional[Tuple]:
+        """Convex-hull cross-section row of one slab, or None if the hull can't be built"""
+        # Flat slabs are rejected up front instead of letting Qhull raise
+        candidates = _hull_candidates(points_2d)
+        if candidates is None:
+            return None
+
+        try:
+            # Compute convex hull for circumference
+            hull = ConvexHull(candidates)
+        except QhullError:
+            # Nearly flat beyond what the area check can see
+            return None
+        hull_points = candidates[hull.vertices]
+
+        # Compute metrics
+        circumference = hull.area  # In 2D, "area" is perimeter
+        center = hull_points.mean(axis=0)
+        width, depth = np.ptp(points_2d, axis=0)
+
+        # In 2D the hull's "volume" is its enclosed area
+        area = hull.volume
+
+        return (height, hull_points, circumference, center, width, depth, area)
 
     def _detect_landmarks(self):
         """
@@ -272,21 +396,19 @@ class BodyModel:
         - Crotch: Where body splits into two legs (circumference drops sharply)
         - Shoulders: Widest point in upper body
         """
-        if not self.cross_sections:
+        sections = self.cross_sections
+        if len(sections) == 0:
             return
 
-        heights = sorted(self.cross_sections.keys())
-        circumferences = [self.cross_sections[h].circumference for h in heights]
-        widths = [self.cross_sections[h].width for h in heights]
+        heights = sections.heights
+        circumferences = sections.circumferences
+        widths = sections.widths
+        centers = sections.centers
 
-        heights = np.array(heights)
-        circumferences = np.array(circumferences)
-        widths = np.array(widths)
-
-        # Smooth the signals for better peak detection
-        from scipy.ndimage import gaussian_filter1d
-        circ_smooth = gaussian_filter1d(circumferences, sigma=3)
-        width_smooth = gaussian_filter1d(widths, sigma=3)
+        # Smooth the signals for better peak detection (both rows in one filter pass)
+        circ_smooth, width_smooth = ndimage.gaussian_filter1d(
+            np.stack([circumferences, widths]), sigma=3, axis=1
+        )
 
         # Find waist (minimum circumference in middle third of body)
         middle_start = int(len(heights) * 0.3)
@@ -296,9 +418,9 @@ class BodyModel:
         waist_height = heights[waist_idx]
 
         self.landmarks[BodyLandmark.WAIST] = np.array([
-            self.cross_sections[waist_height].center[0],
+            centers[waist_idx, 0],
             waist_height,
-            self.cross_sections[waist_height].center[1]
+            centers[waist_idx, 1]
         ])
 
         # Find hip (maximum circumference below waist)
@@ -307,9 +429,9 @@ class BodyModel:
             hip_idx = np.argmax(below_waist)
             hip_height = heights[hip_idx]
             self.landmarks[BodyLandmark.HIP] = np.array([
-                self.cross_sections[hip_height].center[0],
+                centers[hip_idx, 0],
                 hip_height,
-                self.cross_sections[hip_height].center[1]
+                centers[hip_idx, 1]
             ])
 
         # Find bust (maximum circumference above waist, below shoulders)
@@ -318,7 +440,7 @@ class BodyModel:
         if len(above_waist) > 5:
             bust_idx = waist_idx + np.argmax(above_waist)
             bust_height = heights[bust_idx]
-            cs = self.cross_sections[bust_height]
+            cs = sections.row(bust_idx)
 
             # Bust apexes are the widest points
             self.landmarks[BodyLandmark.BUST_APEX_LEFT] = np.array([
@@ -338,7 +460,7 @@ class BodyModel:
         if len(upper_width) > 3:
             shoulder_idx = upper_start + np.argmax(upper_width)
             shoulder_height = heights[shoulder_idx]
-            cs = self.cross_sections[shoulder_height]
+            cs = sections.row(shoulder_idx)
 
             self.landmarks[BodyLandmark.LEFT_SHOULDER] = np.array([
                 cs.center[0] - cs.width / 2,
@@ -368,15 +490,15 @@ class BodyModel:
                 hip_circ = circ_smooth[hip_idx]
                 threshold = hip_circ * 0.6
 
-                for i in range(hip_idx - 1, -1, -1):
-                    if circ_smooth[i] < threshold:
-                        crotch_height = heights[i + 2]  # Slightly above the drop
-                        self.landmarks[BodyLandmark.CROTCH] = np.array([
-                            self.cross_sections[crotch_height].center[0],
-                            crotch_height,
-                            self.cross_sections[crotch_height].center[1]
-                        ])
-                        break
+                # Highest section below the hip that falls under the threshold
+                drops = np.flatnonzero(below_hip < threshold)
+                if drops.size:
+                    crotch_idx = drops[-1] + 2  # Slightly above the drop
+                    self.landmarks[BodyLandmark.CROTCH] = np.array([
+                        centers[crotch_idx, 0],
+                        heights[crotch_idx],
+                        centers[crotch_idx, 1]
+                    ])
 
         # Find knees (local minimum in leg circumference)
         if BodyLandmark.CROTCH in self.landmarks:
@@ -391,25 +513,25 @@ class BodyModel:
             if knee_idx > 0 and knee_idx < len(heights):
                 knee_height = heights[knee_idx]
                 self.landmarks[BodyLandmark.LEFT_KNEE] = np.array([
-                    -self.cross_sections[knee_height].width / 4,
+                    -widths[knee_idx] / 4,
                     knee_height,
                     0
                 ])
                 self.landmarks[BodyLandmark.RIGHT_KNEE] = np.array([
-                    self.cross_sections[knee_height].width / 4,
+                    widths[knee_idx] / 4,
                     knee_height,
                     0
                 ])
 
         # Find ankles (bottom of mesh)
-        ankle_height = heights[2]  # A bit above the floor
-        if ankle_height in self.cross_sections:
-            cs = self.cross_sections[ankle_height]
+        ankle_idx = 2  # A bit above the floor
+        if ankle_idx < len(sections):
+            ankle_height = heights[ankle_idx]
             self.landmarks[BodyLandmark.LEFT_ANKLE] = np.array([
-                -cs.width / 4, ankle_height, 0
+                -widths[ankle_idx] / 4, ankle_height, 0
             ])
             self.landmarks[BodyLandmark.RIGHT_ANKLE] = np.array([
-                cs.width / 4, ankle_height, 0
+                widths[ankle_idx] / 4, ankle_height, 0
             ])
 
         # Top of head
@@ -419,7 +541,7 @@ class BodyModel:
 
     def _extract_measurements(self):
         """Extract body measurements from landmarks and cross-sections"""
-        heights = sorted(self.cross_sections.keys())
+        sections = self.cross_sections
 
         # Total height
         self.measurements.total_height = self.height
@@ -441,27 +563,21 @@ class BodyModel:
         def get_circ_at_landmark(landmark: BodyLandmark) -> float:
             if landmark not in self.landmarks:
                 return 0.0
-            height = self.landmarks[landmark][1]
-            # Find closest cross-section
-            closest = min(heights, key=lambda h: abs(h - height))
-            return self.cross_sections[closest].circumference
+            return sections.circumferences[sections.nearest(self.landmarks[landmark][1])]
 
         if BodyLandmark.WAIST in self.landmarks:
             self.measurements.waist_circumference = get_circ_at_landmark(BodyLandmark.WAIST)
-            self.measurements.waist_width = self.cross_sections[
-                self.landmarks[BodyLandmark.WAIST][1]
-            ].width if self.landmarks[BodyLandmark.WAIST][1] in self.cross_sections else 0
+            # The waist landmark sits exactly on a section height
+            self.measurements.waist_width = sections.widths[sections.nearest(self.landmarks[BodyLandmark.WAIST][1])]
 
         if BodyLandmark.HIP in self.landmarks:
             self.measurements.hip_circumference = get_circ_at_landmark(BodyLandmark.HIP)
             hip_h = self.landmarks[BodyLandmark.HIP][1]
-            closest = min(heights, key=lambda h: abs(h - hip_h))
-            self.measurements.hip_width = self.cross_sections[closest].width
+            self.measurements.hip_width = sections.widths[sections.nearest(hip_h)]
 
         if BodyLandmark.BUST_APEX_LEFT in self.landmarks:
             bust_h = self.landmarks[BodyLandmark.BUST_APEX_LEFT][1]
-            closest = min(heights, key=lambda h: abs(h - bust_h))
-            self.measurements.bust_circumference = self.cross_sections[closest].circumference
+            self.measurements.bust_circumference = sections.circumferences[sections.nearest(bust_h)]
             self.measurements.bust_height = bust_h - self.min_y
 
         # Shoulder width
@@ -500,24 +616,18 @@ class BodyModel:
         if BodyLandmark.CROTCH in self.landmarks:
             crotch_h = self.landmarks[BodyLandmark.CROTCH][1]
             thigh_h = crotch_h - 50  # 50mm below crotch
-            closest = min(heights, key=lambda h: abs(h - thigh_h))
-            if closest in self.cross_sections:
-                # Divide by 2 for single leg
-                self.measurements.thigh_circumference = self.cross_sections[closest].circumference / 2
+            # Divide by 2 for single leg
+            self.measurements.thigh_circumference = sections.circumferences[sections.nearest(thigh_h)] / 2
 
         # Knee circumference
         if BodyLandmark.LEFT_KNEE in self.landmarks:
             knee_h = self.landmarks[BodyLandmark.LEFT_KNEE][1]
-            closest = min(heights, key=lambda h: abs(h - knee_h))
-            if closest in self.cross_sections:
-                self.measurements.knee_circumference = self.cross_sections[closest].circumference / 2
+            self.measurements.knee_circumference = sections.circumferences[sections.nearest(knee_h)] / 2
 
         # Ankle circumference
         if BodyLandmark.LEFT_ANKLE in self.landmarks:
             ankle_h = self.landmarks[BodyLandmark.LEFT_ANKLE][1]
-            closest = min(heights, key=lambda h: abs(h - ankle_h))
-            if closest in self.cross_sections:
-                self.measurements.ankle_circumference = self.cross_sections[closest].circumference / 2
+            self.measurements.ankle_circumference = sections.circumferences[sections.nearest(ankle_h)] / 2
 
     def generate_movement_envelope(self,
                                    ease_profile: str = "default") -> MovementEnvelope:
@@ -530,81 +640,73 @@ class BodyModel:
         Returns:
             MovementEnvelope with expanded vertices
         """
+        ease_map = self.resolve_ease_map(ease_profile)
+        return MovementEnvelope(
+            base_mesh_vertices=self.vertices,
+            expanded_vertices=self.expand_vertices(ease_map),
+            ease_map=ease_map
+        )
+
+    @staticmethod
+    def resolve_ease_map(ease_profile: str = "default") -> Dict[str, float]:
+        """Ease per body zone for a movement profile; no geometry is touched"""
         if ease_profile == "wild":
-            ease_map = MovementEnvelope.wild_movement_ease()
+            return MovementEnvelope.wild_movement_ease()
         elif ease_profile == "default":
-            ease_map = MovementEnvelope.default_ease()
+            return MovementEnvelope.default_ease()
         else:
-            ease_map = MovementEnvelope.default_ease()
+            return MovementEnvelope.default_ease()
 
-        # Create expanded vertices
-        expanded = self.vertices.copy()
+    def expand_vertices(self, ease_map: Dict[str, float]) -> np.ndarray:
+        """Body vertices pushed outward by the ease of the zone each one falls in"""
+        # Ease per vertex by height zone; later zones override earlier ones where they overlap
+        heights = self.vertices[:, 1]
+        ease = np.full(len(heights), 20.0, dtype=self.vertices.dtype)  # Default ease
 
-        # Expand vertices based on their height (which landmark zone they're in)
-        for i, v in enumerate(expanded):
-            height = v[1]
-
-            # Determine which zone this vertex is in and apply appropriate ease
-            ease = 20.0  # Default ease
-
-            if BodyLandmark.SHOULDER_CENTER in self.landmarks:
-                if height > self.landmarks[BodyLandmark.SHOULDER_CENTER][1] - 50:
-                    ease = ease_map.get('shoulder', 50.0)
-
-            if BodyLandmark.WAIST in self.landmarks:
-                waist_h = self.landmarks[BodyLandmark.WAIST][1]
-                if abs(height - waist_h) < 100:
-                    ease = ease_map.get('waist', 20.0)
-
-            if BodyLandmark.HIP in self.landmarks:
-                hip_h = self.landmarks[BodyLandmark.HIP][1]
-                if abs(height - hip_h) < 100:
-                    ease = ease_map.get('hip', 40.0)
-
-            if BodyLandmark.CROTCH in self.landmarks:
-                crotch_h = self.landmarks[BodyLandmark.CROTCH][1]
-                if abs(height - crotch_h) < 100:
-                    ease = ease_map.get('crotch', 60.0)
-
-            if BodyLandmark.LEFT_KNEE in self.landmarks:
-                knee_h = self.landmarks[BodyLandmark.LEFT_KNEE][1]
-                if abs(height - knee_h) < 100:
-                    ease = ease_map.get('knee', 50.0)
-
-            # Expand outward from center (X and Z directions)
-            center_xz = np.array([0, v[2]])  # Assuming centered at X=0
-            direction = v[[0, 2]] - center_xz
-            if np.linalg.norm(direction) > 0:
-                direction = direction / np.linalg.norm(direction)
-                expanded[i, 0] += direction[0] * ease
-                expanded[i, 2] += direction[1] * ease
-
-        return MovementEnvelope(
-            base_mesh_vertices=self.vertices,
-            expanded_vertices=expanded,
-            ease_map=ease_map
-        )
+        if BodyLandmark.SHOULDER_CENTER in self.landmarks:
+            ease[heights > self.landmarks[BodyLandmark.SHOULDER_CENTER][1] - 50] = ease_map.get('shoulder', 50.0)
+
+        for landmark, zone, fallback in (
+            (BodyLandmark.WAIST, 'waist', 20.0),
+            (BodyLandmark.HIP, 'hip', 40.0),
+            (BodyLandmark.CROTCH, 'crotch', 60.0),
+            (BodyLandmark.LEFT_KNEE, 'knee', 50.0),
+        ):
+            if landmark in self.landmarks:
+                zone_h = self.landmarks[landmark][1]
+                ease[np.abs(heights - zone_h) < 100] = ease_map.get(zone, fallback)
+
+        # Expand outward from the X=0 center line. Direction is (x, 0) normalized,
+        # so its norm is |x| and the unit vector is just sign(x): only X moves, by
+        # +/- ease, and vertices on the center line stay put. No norms needed
+        offset = np.sign(self.vertices[:, 0])
+        offset *= ease
+        expanded = self.vertices.copy()
+        expanded[:, 0] += offset
+        return expanded
 
-    def to_dict(self) -> Dict[str, Any]:
+    def to_dict(self, include_sections: bool = False) -> Dict[str, Any]:
         """Export body model to dictionary for API responses"""
-        return {
+        result = {
             'landmarks': {
-                lm.value: pos.tolist() for lm, pos in self.landmarks.items()
+                _LANDMARK_KEYS[lm]: pos for lm, pos in self.landmarks.items()
             },
             'measurements': self.measurements.to_dict(),
-            'cross_sections': {
-                str(h): cs.to_dict() for h, cs in self.cross_sections.items()
-            },
             'bounds': {
                 'min_y': float(self.min_y),
                 'max_y': float(self.max_y),
                 'height': float(self.height)
             }
         }
+        if include_sections:
+            result['cross_sections'] = self.cross_sections.to_dict()
+        return result
 
 
 def analyze_body_mesh(vertices: np.ndarray, faces: np.ndarray,
-                      movement_profile: str = "wild") -> Dict[str, Any]:
+                      movement_profile: str = "wild",
+                      compute_envelope: bool = False,
+                      include_sections: bool = False) -> Dict[str, Any]:
     """
     Convenience function for API use.
 
@@ -612,6 +714,8 @@ def analyze_body_mesh(vertices: np.ndarray, faces: np.ndarray,
         vertices: Nx3 array of vertex positions
         faces: Mx3 array of face indices
         movement_profile: "default" or "wild" for movement ease
+        compute_envelope: Also return the expanded envelope vertices (Nx3)
+        include_sections: Also return the cross-section table as parallel arrays
 
     Returns:
         Dict with landmarks, measurements, and movement envelope info
@@ -619,12 +723,14 @@ def analyze_body_mesh(vertices: np.ndarray, faces: np.ndarray,
     model = BodyModel(vertices, faces)
     model.analyze()
 
-    envelope = model.generate_movement_envelope(movement_profile)
+    ease_map = model.resolve_ease_map(movement_profile)
 
-    result = model.to_dict()
+    result = model.to_dict(include_sections=include_sections)
     result['movement_envelope'] = {
         'ease_profile': movement_profile,
-        'ease_map': envelope.ease_map
+        'ease_map': ease_map
     }
+    if compute_envelope:
+        result['movement_envelope']['expanded_vertices'] = model.expand_vertices(ease_map)
 
     return result
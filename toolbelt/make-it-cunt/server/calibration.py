@@ -5,13 +5,30 @@ Detects ArUco markers in images and calculates the scale factor
 (pixels per centimeter) for accurate real-world measurements.
 """
 
+import os
 import cv2
 import numpy as np
 from cv2 import aruco
 from typing import Tuple, Dict, List, Optional
-import io
-from PIL import Image
+import hashlib
+import threading
+from functools import lru_cache
 
+from analysis_pool import run_batch
+
+try:
+    from turbojpeg import TurboJPEG, TJPF_GRAY
+    _turbojpeg = TurboJPEG()
+    TURBOJPEG_AVAILABLE = True
+except (ImportError, RuntimeError, OSError):
+    # Module or the libjpeg-turbo shared library missing
+    TURBOJPEG_AVAILABLE = False
+
+
+# OpenCV's own thread pool size. It defaults to every core, which oversubscribes
+# the machine once several gunicorn workers (or analysis processes) detect at
+# the same time; set ARUCO_CV_THREADS higher for a single-worker server
+cv2.setNumThreads(int(os.environ.get('ARUCO_CV_THREADS', '2')))
 
 # Default marker size in centimeters (5cm x 5cm markers)
 DEFAULT_MARKER_SIZE_CM = 5.0
@@ -19,36 +36,81 @@ DEFAULT_MARKER_SIZE_CM = 5.0
 # ArUco dictionary - using 4x4 with 50 markers (simple, robust)
 ARUCO_DICT = aruco.getPredefinedDictionary(aruco.DICT_4X4_50)
 
+JPEG_MAGIC = b'\xff\xd8\xff'
+
+# Long side (px) calibration photos are shrunk to before detection; the card's
+# markers stay far above the detector's minimum size at this resolution
+MAX_DETECTION_SIZE_PX = 1500
+
+# Markers whose bounding-box diagonal is below this fraction of the image
+# diagonal are treated as spurious and left out of the scale
+MIN_MARKER_DIAGONAL_FRACTION = 0.02
+
+
+def _detector_params(win_size_min: int, win_size_max: int) -> aruco.DetectorParameters:
+    """Detector tuning shared by both passes, with the given adaptive-threshold window range."""
+    parameters = aruco.DetectorParameters()
+    # Tune for better detection
+    parameters.adaptiveThreshWinSizeMin = win_size_min
+    parameters.adaptiveThreshWinSizeMax = win_size_max
+    parameters.adaptiveThreshWinSizeStep = 10
+    parameters.minMarkerPerimeterRate = 0.02
+    parameters.maxMarkerPerimeterRate = 4.0
+    # ArUco3: decimate the image before contour search. Markers on a calibration
+    # shot are at least ~2% of the frame, so small candidates can be skipped early
+    parameters.useAruco3Detection = True
+    parameters.minSideLengthCanonicalImg = 32
+    parameters.minMarkerLengthRatioOriginalImg = 0.02
+    return parameters
+
+
+# Detectors are built once; detectMarkers doesn't mutate them, so calls can share them.
+# A single 13 px threshold window handles a downscaled calibration shot; the
+# 3/13/23 sweep (three thresholding passes) is only the fallback
+ARUCO_DETECTOR = aruco.ArucoDetector(ARUCO_DICT, _detector_params(13, 13))
+ARUCO_DETECTOR_SWEEP = aruco.ArucoDetector(ARUCO_DICT, _detector_params(3, 23))
+
+# Per-thread 8-bit frames reused as cvtColor/resize destinations, so a steady
+# stream of same-sized photos doesn't allocate a new frame per request
+_scratch = threading.local()
+
+
+def _scratch_frame(name: str, shape: Tuple[int, ...]) -> np.ndarray:
+    """This thread's uint8 buffer called `name`, reallocated when the shape changes."""
+    frame = getattr(_scratch, name, None)
+    if frame is None or frame.shape != shape:
+        frame = np.empty(shape, dtype=np.uint8)
+        setattr(_scratch, name, frame)
+    return frame
+
 
 def detect_aruco_markers(image: np.ndarray) -> Tuple[List, Optional[np.ndarray], List]:
     """
     Detect ArUco markers in an image.
 
     Args:
-        image: BGR image as numpy array
+        image: BGR or single-channel grayscale image as numpy array
 
     Returns:
         Tuple of (corners, ids, rejected)
     """
-    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-
-    parameters = aruco.DetectorParameters()
-    # Tune for better detection
-    parameters.adaptiveThreshWinSizeMin = 3
-    parameters.adaptiveThreshWinSizeMax = 23
-    parameters.adaptiveThreshWinSizeStep = 10
-    parameters.minMarkerPerimeterRate = 0.02
-    parameters.maxMarkerPerimeterRate = 4.0
+    if image.ndim == 2:
+        gray = image
+    else:
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY,
+                            dst=_scratch_frame('gray', image.shape[:2]))
 
-    detector = aruco.ArucoDetector(ARUCO_DICT, parameters)
-    corners, ids, rejected = detector.detectMarkers(gray)
+    corners, ids, rejected = ARUCO_DETECTOR.detectMarkers(gray)
+    if ids is None or len(ids) == 0:
+        corners, ids, rejected = ARUCO_DETECTOR_SWEEP.detectMarkers(gray)
 
     return corners, ids, rejected
 
 
 def calculate_scale_from_markers(
     corners: List,
-    marker_size_cm: float = DEFAULT_MARKER_SIZE_CM
+    marker_size_cm: float = DEFAULT_MARKER_SIZE_CM,
+    image_shape: Optional[Tuple[int, int]] = None
 ) -> Tuple[float, float]:
     """
     Calculate scale factor (pixels per cm) from detected ArUco markers.
@@ -56,6 +118,8 @@ def calculate_scale_from_markers(
     Args:
         corners: List of marker corners from detectMarkers
         marker_size_cm: Physical size of marker side in centimeters
+        image_shape: (height, width) of the image the corners came from; when
+            given, tiny spurious detections are dropped before the scale math
 
     Returns:
         Tuple of (pixels_per_cm, confidence)
@@ -64,37 +128,57 @@ def calculate_scale_from_markers(
     if not corners or len(corners) == 0:
         raise ValueError("No markers detected")
 
-    marker_sizes_px = []
+    # Each corner array is (1, 4, 2) - 4 corners with x,y coordinates; stack to (N, 4, 2)
+    pts = np.asarray([corner[0] for corner in corners], dtype=np.float32)
 
-    for corner in corners:
-        # Corner shape is (1, 4, 2) - 4 corners with x,y coordinates
-        pts = corner[0]
+    if image_shape is not None:
+        pts = pts[large_marker_mask(pts, image_shape)]
+        if len(pts) == 0:
+            raise ValueError("No markers large enough to calibrate from")
 
-        # Calculate all 4 side lengths
-        side_lengths = [
-            np.linalg.norm(pts[i] - pts[(i+1) % 4])
-            for i in range(4)
-        ]
+    return scale_from_corner_array(pts, marker_size_cm)
 
-        # Average side length for this marker
-        avg_side = np.mean(side_lengths)
-        marker_sizes_px.append(avg_side)
 
-        # Check if marker is roughly square (confidence indicator)
-        side_std = np.std(side_lengths)
-        if side_std / avg_side > 0.1:  # More than 10% variation
-            # Marker might be at an angle or distorted
-            pass
+def large_marker_mask(pts: np.ndarray, image_shape: Tuple[int, int]) -> np.ndarray:
+    """
+    Which markers in an (N, 4, 2) corner array are big enough to trust.
+
+    Markers whose bounding-box diagonal is under MIN_MARKER_DIAGONAL_FRACTION
+    of the image diagonal are usually spurious detections.
+    """
+    marker_diagonals = np.hypot(*(pts.max(axis=1) - pts.min(axis=1)).T)
+    return marker_diagonals > MIN_MARKER_DIAGONAL_FRACTION * np.hypot(*image_shape[:2])
+
+
+def scale_from_corner_array(
+    pts: np.ndarray,
+    marker_size_cm: float = DEFAULT_MARKER_SIZE_CM
+) -> Tuple[float, float]:
+    """
+    Scale factor from markers already stacked as an (N, 4, 2) corner array.
+
+    Lets batch callers (e.g. many frames of the same card) skip building
+    per-marker lists. See calculate_scale_from_markers for the return value.
+    """
+    # OpenCV corners are float32; stay there so nothing upcasts to float64
+    pts = np.ascontiguousarray(pts, dtype=np.float32)
+
+    # All 4 side lengths of every marker at once: edges (0-1, 1-2, 2-3, 3-0)
+    edges = pts - np.roll(pts, -1, axis=1)
+    side_lengths = np.sqrt(np.einsum('nij,nij->ni', edges, edges))
+
+    # Average side length per marker
+    marker_sizes_px = side_lengths.mean(axis=1)
 
     # Average across all detected markers
-    avg_marker_px = np.mean(marker_sizes_px)
+    avg_marker_px = float(marker_sizes_px.mean())
 
     # Calculate pixels per centimeter
     pixels_per_cm = avg_marker_px / marker_size_cm
 
     # Calculate confidence based on consistency across markers
     if len(marker_sizes_px) > 1:
-        consistency = 1.0 - (np.std(marker_sizes_px) / avg_marker_px)
+        consistency = 1.0 - (float(marker_sizes_px.std()) / avg_marker_px)
         confidence = max(0.0, min(1.0, consistency))
     else:
         confidence = 0.8  # Single marker, decent confidence
@@ -102,6 +186,33 @@ def calculate_scale_from_markers(
     return pixels_per_cm, confidence
 
 
+def decode_gray(image_bytes) -> Optional[np.ndarray]:
+    """
+    Decode image bytes straight to grayscale, which is all marker detection needs.
+
+    Accepts any bytes-like object (bytes, bytearray, memoryview) without copying it.
+    JPEGs go through libjpeg-turbo when available; everything else uses OpenCV.
+    Returns None if the image can't be decoded.
+    """
+    if TURBOJPEG_AVAILABLE and bytes(memoryview(image_bytes)[:3]) == JPEG_MAGIC:
+        try:
+            # Comes back as (H, W, 1)
+            return _turbojpeg.decode(image_bytes, pixel_format=TJPF_GRAY)[:, :, 0]
+        except OSError:
+            pass
+
+    return cv2.imdecode(np.frombuffer(image_bytes, np.uint8), cv2.IMREAD_GRAYSCALE)
+
+
+def load_gray(image_path: str) -> Optional[np.ndarray]:
+    """Grayscale counterpart of cv2.imread; see decode_gray."""
+    if TURBOJPEG_AVAILABLE:
+        with open(image_path, 'rb') as f:
+            return decode_gray(f.read())
+    # Let OpenCV read the file itself rather than staging it in a bytes object
+    return cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
+
+
 def calibrate_from_image(
     image_path: str = None,
     image_bytes: bytes = None,
@@ -124,22 +235,31 @@ def calibrate_from_image(
             'markers_detected': int,
             'marker_ids': list,
             'confidence': float (0-1),
+            'detection_scale': float (image was resized by this before detection),
             'error': str (if failed)
         }
     """
     try:
-        # Load image
+        # Load image (grayscale only; color is never used for calibration)
         if image_bytes:
-            nparr = np.frombuffer(image_bytes, np.uint8)
-            image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+            image = decode_gray(image_bytes)
         elif image_path:
-            image = cv2.imread(image_path)
+            image = load_gray(image_path)
         else:
             return {'success': False, 'error': 'No image provided'}
 
         if image is None:
             return {'success': False, 'error': 'Failed to load image'}
 
+        # Phone photos are 12+ MP; detect on a downscaled copy and scale back after
+        height, width = image.shape[:2]
+        scale = min(1.0, MAX_DETECTION_SIZE_PX / max(height, width))
+        if scale < 1.0:
+            size = (int(width * scale), int(height * scale))
+            image = cv2.resize(image, size,
+                               dst=_scratch_frame('resized', (size[1], size[0]) + image.shape[2:]),
+                               interpolation=cv2.INTER_AREA)
+
         # Detect markers
         corners, ids, rejected = detect_aruco_markers(image)
 
@@ -150,26 +270,60 @@ def calibrate_from_image(
                 'markers_detected': 0
             }
 
+        # Drop tiny spurious markers; only the ones used for the scale are reported
+        pts = np.asarray([corner[0] for corner in corners], dtype=np.float32)
+        keep = large_marker_mask(pts, image.shape[:2])
+        if not keep.any():
+            return {
+                'success': False,
+                'error': 'No markers large enough to calibrate from. Move the camera closer to the card.',
+                'markers_detected': 0
+            }
+
         # Calculate scale
-        pixels_per_cm, confidence = calculate_scale_from_markers(corners, marker_size_cm)
+        pixels_per_cm, confidence = scale_from_corner_array(pts[keep], marker_size_cm)
+        # Back to original image pixels
+        pixels_per_cm /= scale
 
         return {
             'success': True,
             'scale_ppcm': round(pixels_per_cm, 2),
             'scale_ppi': round(pixels_per_cm * 2.54, 2),
-            'markers_detected': len(ids),
-            'marker_ids': ids.flatten().tolist(),
-            'confidence': round(confidence, 2)
+            'markers_detected': int(keep.sum()),
+            'marker_ids': ids.ravel()[keep].tolist(),
+            'confidence': round(confidence, 2),
+            'detection_scale': round(scale, 4)
         }
 
     except Exception as e:
         return {'success': False, 'error': str(e)}
 
 
+def _calibrate_bytes(image_bytes: bytes, marker_size_cm: float) -> Dict:
+    return calibrate_from_image(image_bytes=image_bytes, marker_size_cm=marker_size_cm)
+
+
+def calibrate_batch(
+    images: List[bytes],
+    marker_size_cm: float = DEFAULT_MARKER_SIZE_CM
+) -> List[Dict]:
+    """
+    Calibrate several photos (e.g. multiple shots or sampled video frames) at once.
+
+    Images are independent, so they are spread over the analysis worker
+    processes; each worker builds its own ArUco detector on import.
+
+    Returns:
+        One calibrate_from_image result dict per image, in order
+    """
+    return run_batch(_calibrate_bytes, images, marker_size_cm)
+
+
 def draw_detected_markers(
     image: np.ndarray,
     corners: List,
-    ids: np.ndarray
+    ids: np.ndarray,
+    in_place: bool = False
 ) -> np.ndarray:
     """
     Draw detected markers on image for visualization.
@@ -178,22 +332,23 @@ def draw_detected_markers(
         image: BGR image
         corners: Detected corner points
         ids: Marker IDs
+        in_place: Draw straight onto `image` instead of a copy
 
     Returns:
         Image with markers drawn
     """
-    output = image.copy()
+    output = image if in_place else image.copy()
 
     if ids is not None and len(ids) > 0:
         aruco.drawDetectedMarkers(output, corners, ids)
 
-        # Add ID labels
-        for i, corner in enumerate(corners):
-            center = corner[0].mean(axis=0).astype(int)
+        # Add ID labels; all marker centers in one reduction over (N, 4, 2)
+        centers = np.stack([corner[0] for corner in corners]).mean(axis=1).astype(int)
+        for marker_id, (cx, cy) in zip(ids.ravel(), centers.tolist()):
             cv2.putText(
                 output,
-                f"ID:{ids[i][0]}",
-                (center[0] - 20, center[1] - 20),
+                f"ID:{marker_id}",
+                (cx - 20, cy - 20),
                 cv2.FONT_HERSHEY_SIMPLEX,
                 0.6,
                 (0, 255, 0),
@@ -276,34 +431,52 @@ def _generate_single_aruco_svg(marker_id: int, x: float, y: float, size: float)
 
     Uses DICT_4X4_50 encoding.
     """
-    # Generate the marker using OpenCV
-    marker_img = aruco.generateImageMarker(ARUCO_DICT, marker_id, 100)
+    return f'  <g transform="translate({x},{y})">\n{_aruco_marker_rects(marker_id, size)}\n  </g>'
+
+
+# One black cell run of a marker: x, y, width, height
+_RECT_TEMPLATE = '    <rect x="%.1f" y="%.1f" width="%.1f" height="%.1f" fill="black"/>'
+
+
+@lru_cache(maxsize=64)
+def _aruco_marker_rects(marker_id: int, size: float) -> str:
+    """
+    The marker's <rect> lines, relative to its top-left corner.
+
+    Cached per (marker_id, size): the same card is served over and over,
+    and only its position differs between markers.
+    """
+    # Generate the marker using OpenCV, one pixel per cell:
+    # 4x4 data + 1 border on each side = 6x6
+    black = aruco.generateImageMarker(ARUCO_DICT, marker_id, 6) < 128
 
     # Convert to SVG rectangles
-    cell_size = size / 6  # 4x4 data + 1 border on each side = 6 cells
+    cell_size = size / 6
 
-    svg_parts = [f'  <g transform="translate({x},{y})">']
+    svg_parts = []
 
-    # The marker is 6x6 including border
+    # One rect per horizontal run of black cells
     for row in range(6):
-        for col in range(6):
-            # Map to the 100x100 image
-            img_row = int((row + 0.5) * 100 / 6)
-            img_col = int((col + 0.5) * 100 / 6)
-
-            # Check if this cell should be black
-            if marker_img[img_row, img_col] < 128:
-                rect_x = col * cell_size
-                rect_y = row * cell_size
-                svg_parts.append(
-                    f'    <rect x="{rect_x:.1f}" y="{rect_y:.1f}" '
-                    f'width="{cell_size:.1f}" height="{cell_size:.1f}" fill="black"/>'
-                )
-
-    svg_parts.append('  </g>')
+        col = 0
+        while col < 6:
+            if not black[row, col]:
+                col += 1
+                continue
+            start = col
+            while col < 6 and black[row, col]:
+                col += 1
+            svg_parts.append(_RECT_TEMPLATE % (
+                start * cell_size, row * cell_size, (col - start) * cell_size, cell_size
+            ))
+
     return '\n'.join(svg_parts)
 
 
+# The default card is rendered once at import and served as-is, with an ETag for HTTP caching
+DEFAULT_CALIBRATION_CARD_SVG = generate_aruco_card_svg(marker_size_cm=DEFAULT_MARKER_SIZE_CM).encode('utf-8')
+DEFAULT_CALIBRATION_CARD_ETAG = hashlib.sha256(DEFAULT_CALIBRATION_CARD_SVG).hexdigest()
+
+
 if __name__ == '__main__':
     # Test: Generate calibration card
     svg = generate_aruco_card_svg()
@@ -8,15 +8,21 @@ length deficits, and movement conflicts.
 Dependencies: numpy, scipy, trimesh (optional)
 """
 
+import os
+from functools import cached_property
+
 import numpy as np
 from dataclasses import dataclass, field
 from typing import Dict, List, Optional, Tuple, Any
 from enum import Enum
-from scipy.spatial import cKDTree
 
 from body_model import BodyModel, BodyLandmark, MovementEnvelope
 from garment_model import GarmentModel, GarmentType
 
+# Threads for batched nearest-neighbour queries (-1 = all cores). Lower it when
+# several analysis processes run at once
+KDTREE_WORKERS = int(os.environ.get('KDTREE_WORKERS', '-1'))
+
 
 class FitIssueType(Enum):
     """Types of fit problems we can detect"""
@@ -35,6 +41,10 @@ class FitIssueSeverity(Enum):
     CRITICAL = "critical"  # Will cause damage or extreme discomfort
 
 
+# Severities are declared mildest first
+_SEVERITY_RANK = {severity: rank for rank, severity in enumerate(FitIssueSeverity)}
+
+
 class BodyZone(Enum):
     """Body zones for localized fit analysis"""
     SHOULDERS = "shoulders"
@@ -59,14 +69,14 @@ class FitIssue:
     location: np.ndarray  # 3D location of the issue
     amount: float  # How much (in mm) - negative for compression, positive for gap
     description: str
-    affected_vertices: List[int] = field(default_factory=list)
+    affected_vertices: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.int32))
 
     def to_dict(self) -> Dict[str, Any]:
         return {
             'type': self.issue_type.value,
             'severity': self.severity.value,
             'zone': self.body_zone.value,
-            'location': self.location.tolist(),
+            'location': self.location,
             'amount_mm': float(self.amount),
             'description': self.description,
             'affected_vertex_count': len(self.affected_vertices)
@@ -101,7 +111,7 @@ class FitAnalysisResult:
     issues: List[FitIssue]
     recommendations: List[ModificationRecommendation]
     overall_fit_score: float  # 0-100, higher is better
-    distance_map: Optional[np.ndarray] = None  # Per-vertex distance body→garment
+    distance_map: Optional[np.ndarray] = None  # Per-vertex distance body→garment (float32)
 
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -128,6 +138,39 @@ class FitAnalysisResult:
         return counts
 
 
+@dataclass(frozen=True)
+class _LengthCheck:
+    """A body length the garment has to cover"""
+    body_measurement: str
+    garment_measurement: str
+    body_zone: BodyZone
+    min_deficit: float  # Shortfall (mm) below which nothing is reported
+    severities: Tuple[Tuple[float, FitIssueSeverity], ...]  # (deficit over, severity), worst first
+    default_severity: FitIssueSeverity
+    description: str  # Formatted with the deficit in mm
+    landmark: Optional[BodyLandmark] = None  # Issue location, if detected
+    fallback_height: Optional[float] = None  # Fraction of body height; None = feet
+    garment_type: Optional[GarmentType] = None  # Only check this garment type
+
+
+_LENGTH_CHECKS = (
+    _LengthCheck('inseam', 'inseam_length', BodyZone.ANKLES, 10,
+                 ((50, FitIssueSeverity.SEVERE), (25, FitIssueSeverity.MODERATE)),
+                 FitIssueSeverity.MINOR, "Inseam {:.0f}mm too short for body"),
+    _LengthCheck('outseam', 'outseam_length', BodyZone.ANKLES, 10,
+                 ((50, FitIssueSeverity.SEVERE), (25, FitIssueSeverity.MODERATE)),
+                 FitIssueSeverity.MINOR, "Outseam {:.0f}mm too short"),
+    _LengthCheck('front_rise', 'front_rise', BodyZone.CROTCH, 10,
+                 ((30, FitIssueSeverity.SEVERE),),
+                 FitIssueSeverity.MODERATE, "Rise {:.0f}mm too short - will pull at crotch",
+                 BodyLandmark.CROTCH, 0.4),
+    # For shirts, body_length is torso
+    _LengthCheck('torso_length', 'body_length', BodyZone.WAIST, 20, (),
+                 FitIssueSeverity.MODERATE, "Torso {:.0f}mm too short - will ride up",
+                 BodyLandmark.WAIST, 0.55, GarmentType.SHIRT),
+)
+
+
 class FitAnalyzer:
     """
     Analyzes fit between a body and garment mesh.
@@ -138,12 +181,33 @@ class FitAnalyzer:
     (positive).
     """
 
+    _ZONES = list(BodyZone)
+    _ZONE_INDEX = {zone: i for i, zone in enumerate(_ZONES)}
+
+    # Zones by relative height when no landmark zone applies, bottom to top
+    _FALLBACK_ZONES = [
+        BodyZone.ANKLES, BodyZone.CALVES, BodyZone.KNEES, BodyZone.THIGHS,
+        BodyZone.HIPS, BodyZone.WAIST, BodyZone.BUST, BodyZone.SHOULDERS
+    ]
+    _FALLBACK_BOUNDS = np.array([0.1, 0.2, 0.3, 0.4, 0.55, 0.7, 0.85])
+
+    # Landmark zones in priority order: (landmark, zone, half-height in mm)
+    _LANDMARK_ZONES = [
+        (BodyLandmark.SHOULDER_CENTER, BodyZone.SHOULDERS, 100),
+        (BodyLandmark.BUST_APEX_LEFT, BodyZone.BUST, 100),
+        (BodyLandmark.WAIST, BodyZone.WAIST, 100),
+        (BodyLandmark.HIP, BodyZone.HIPS, 100),
+        (BodyLandmark.CROTCH, BodyZone.CROTCH, 80),
+        (BodyLandmark.LEFT_KNEE, BodyZone.KNEES, 80),
+    ]
+
     # Thresholds for fit issues (in mm)
     COMPRESSION_THRESHOLD = -5  # Negative = body outside garment
     GAP_THRESHOLD_MINOR = 20
     GAP_THRESHOLD_MODERATE = 40
     GAP_THRESHOLD_SEVERE = 60
     SEAM_STRESS_THRESHOLD = -10
+    FAR_DISTANCE = 200  # Body farther than this from the garment is not covered by it
 
     def __init__(self, body: BodyModel, garment: GarmentModel,
                  movement_envelope: Optional[MovementEnvelope] = None):
@@ -159,8 +223,27 @@ class FitAnalyzer:
         self.garment = garment
         self.movement_envelope = movement_envelope
 
-        # Build spatial index for garment
-        self._garment_tree = cKDTree(garment.vertices)
+        # Spatial index for garment, shared by every analysis of this garment.
+        # Fit is judged at mm scale, so the distance map works in single precision
+        self._garment_v32 = garment.vertices_f32
+        self._body_v32 = np.ascontiguousarray(body.vertices, dtype=np.float32)
+        self._garment_tree = garment.spatial_index
+
+        # Per-vertex garment normals, for inside/outside tests
+        self._garment_normals = garment.vertex_normals
+
+        # Zone classification tables: landmark heights (inf when not
+        # detected, so they never match) in priority order
+        landmarks = body.landmarks
+        self._landmark_y = np.array([landmarks[lm][1] if lm in landmarks else np.inf
+                                     for lm, _, _ in self._LANDMARK_ZONES], dtype=np.float32)
+        self._landmark_reach = np.array([reach for _, _, reach in self._LANDMARK_ZONES],
+                                        dtype=np.float32)
+        # Zone labels are int8 so the stable sort in _zone_stats is a radix sort
+        self._landmark_zone = np.array([self._ZONE_INDEX[zone]
+                                        for _, zone, _ in self._LANDMARK_ZONES], dtype=np.int8)
+        self._fallback_zone = np.array([self._ZONE_INDEX[zone] for zone in self._FALLBACK_ZONES],
+                                       dtype=np.int8)
 
     def analyze(self) -> FitAnalysisResult:
         """
@@ -175,8 +258,8 @@ class FitAnalyzer:
         """
         issues = []
 
-        # Compute distance map
-        distance_map = self._compute_distance_map()
+        # Compute distance map (once per body/garment pair)
+        distance_map = self._distance_map
 
         # Find compression zones (body too big for garment)
         compression_issues = self._find_compression_zones(distance_map)
@@ -208,165 +291,122 @@ class FitAnalyzer:
             distance_map=distance_map
         )
 
-    def _compute_distance_map(self) -> np.ndarray:
+    @cached_property
+    def _coverage(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Body→garment distance map and uncovered mask, shared by repeated analyses"""
+        return self._compute_distance_map()
+
+    @property
+    def _distance_map(self) -> np.ndarray:
+        return self._coverage[0]
+
+    @property
+    def _uncovered(self) -> np.ndarray:
+        """Body vertices the garment doesn't reach within FAR_DISTANCE"""
+        return self._coverage[1]
+
+    @cached_property
+    def _zone_per_vertex(self) -> np.ndarray:
+        """Body zone of every body vertex (int8 index into _ZONES)"""
+        return self._zone_indices(self.body.vertices)
+
+    def _compute_distance_map(self) -> Tuple[np.ndarray, np.ndarray]:
         """
         Compute signed distance from each body vertex to garment surface.
 
         Positive = body inside garment (good, or gap if too large)
         Negative = body outside garment (compression)
 
-        Uses ray casting to determine inside/outside.
+        Uses ray casting to determine inside/outside. Returns the map and
+        the mask of body vertices beyond FAR_DISTANCE from the garment;
+        those aren't covered by it, and their map entry is only clamped
+        to FAR_DISTANCE for display.
         """
-        # Find nearest garment point for each body vertex
-        distances, indices = self._garment_tree.query(self.body.vertices)
+        # Find nearest garment point for each body vertex, giving up past
+        # FAR_DISTANCE (those come back with index == number of points)
+        distances, indices = self._garment_tree.query(
+            self._body_v32, distance_upper_bound=self.FAR_DISTANCE, workers=KDTREE_WORKERS)
+        distances = distances.astype(np.float32)
+        far = indices == len(self._garment_v32)
+        indices[far] = 0
 
         # Determine sign using surface normals
         # If body point is in direction of garment normal = inside (positive)
         # If body point is opposite garment normal = outside (negative)
 
-        signed_distances = np.zeros(len(self.body.vertices))
-
-        for i, (dist, garment_idx) in enumerate(zip(distances, indices)):
-            body_point = self.body.vertices[i]
-            garment_point = self.garment.vertices[garment_idx]
-
-            # Vector from garment to body
-            direction = body_point - garment_point
-
-            # Get approximate surface normal at garment point
-            # (simplified: use average of adjacent face normals)
-            normal = self._get_vertex_normal(garment_idx)
-
-            # Dot product determines inside/outside
-            dot = np.dot(direction, normal)
-
-            # Positive dot = body is in normal direction = outside garment = compression
-            # Negative dot = body is opposite normal direction = inside garment = ok/gap
-            signed_distances[i] = -np.sign(dot) * dist
-
-        return signed_distances
-
-    def _get_vertex_normal(self, vertex_idx: int) -> np.ndarray:
-        """Get the normal vector at a garment vertex"""
-        # Find faces containing this vertex
-        adjacent_faces = []
-        for face_idx, face in enumerate(self.garment.faces):
-            if vertex_idx in face:
-                adjacent_faces.append(face_idx)
-
-        if not adjacent_faces:
-            return np.array([0, 1, 0])  # Default up
-
-        # Average the normals
-        normals = []
-        for face_idx in adjacent_faces:
-            face = self.garment.faces[face_idx]
-            v0, v1, v2 = self.garment.vertices[face]
-            edge1 = v1 - v0
-            edge2 = v2 - v0
-            normal = np.cross(edge1, edge2)
-            length = np.linalg.norm(normal)
-            if length > 0:
-                normals.append(normal / length)
-
-        if not normals:
-            return np.array([0, 1, 0])
-
-        avg_normal = np.mean(normals, axis=0)
-        length = np.linalg.norm(avg_normal)
-        if length > 0:
-            return avg_normal / length
-        return np.array([0, 1, 0])
-
-    def _classify_body_zone(self, vertex: np.ndarray) -> BodyZone:
-        """Classify which body zone a vertex belongs to"""
-        height = vertex[1]
-        rel_height = (height - self.body.min_y) / self.body.height
-
-        # Use landmarks if available
-        landmarks = self.body.landmarks
-
-        # Check shoulder zone
-        if BodyLandmark.SHOULDER_CENTER in landmarks:
-            shoulder_h = landmarks[BodyLandmark.SHOULDER_CENTER][1]
-            if abs(height - shoulder_h) < 100:
-                return BodyZone.SHOULDERS
-
-        # Check bust zone
-        if BodyLandmark.BUST_APEX_LEFT in landmarks:
-            bust_h = landmarks[BodyLandmark.BUST_APEX_LEFT][1]
-            if abs(height - bust_h) < 100:
-                return BodyZone.BUST
-
-        # Check waist zone
-        if BodyLandmark.WAIST in landmarks:
-            waist_h = landmarks[BodyLandmark.WAIST][1]
-            if abs(height - waist_h) < 100:
-                return BodyZone.WAIST
-
-        # Check hip zone
-        if BodyLandmark.HIP in landmarks:
-            hip_h = landmarks[BodyLandmark.HIP][1]
-            if abs(height - hip_h) < 100:
-                return BodyZone.HIPS
-
-        # Check crotch zone
-        if BodyLandmark.CROTCH in landmarks:
-            crotch_h = landmarks[BodyLandmark.CROTCH][1]
-            if abs(height - crotch_h) < 80:
-                return BodyZone.CROTCH
-
-        # Check knee zone
-        if BodyLandmark.LEFT_KNEE in landmarks:
-            knee_h = landmarks[BodyLandmark.LEFT_KNEE][1]
-            if abs(height - knee_h) < 80:
-                return BodyZone.KNEES
-
-        # Fallback to relative height
-        if rel_height > 0.85:
-            return BodyZone.SHOULDERS
-        elif rel_height > 0.7:
-            return BodyZone.BUST
-        elif rel_height > 0.55:
-            return BodyZone.WAIST
-        elif rel_height > 0.4:
-            return BodyZone.HIPS
-        elif rel_height > 0.3:
-            return BodyZone.THIGHS
-        elif rel_height > 0.2:
-            return BodyZone.KNEES
-        elif rel_height > 0.1:
-            return BodyZone.CALVES
-        else:
-            return BodyZone.ANKLES
+        # Vector from garment to body
+        directions = self._body_v32 - self._garment_v32[indices]
+
+        # Dot product determines inside/outside
+        dots = np.einsum('ij,ij->i', directions, self._garment_normals[indices])
+
+        # Positive dot = body is in normal direction = outside garment = compression
+        # Negative dot = body is opposite normal direction = inside garment = ok/gap
+        signed = -np.sign(dots) * distances
+
+        # The garment doesn't reach these: no real distance to report
+        signed[far] = self.FAR_DISTANCE
+        return signed, far
+
+    def _zone_indices(self, vertices: np.ndarray) -> np.ndarray:
+        """Classify which body zone each vertex belongs to (index into _ZONES)"""
+        heights = vertices[:, 1]
+        rel_heights = (heights - self.body.min_y) / self.body.height
+
+        # Use landmarks if available; the first matching landmark zone wins
+        hits = np.abs(heights[:, None] - self._landmark_y) < self._landmark_reach
+        first_hit = np.argmax(hits, axis=1)
+
+        # Fallback to relative height (a bound itself belongs to the zone below)
+        fallback = self._fallback_zone[np.searchsorted(self._FALLBACK_BOUNDS, rel_heights)]
+
+        return np.where(hits.any(axis=1), self._landmark_zone[first_hit], fallback)
+
+    def _zone_stats(self, indices: np.ndarray, distance_map: np.ndarray, extreme: np.ufunc):
+        """
+        Per-zone distance statistics over a subset of body vertices.
+
+        Yields (zone, member indices, mean distance, extreme distance, center)
+        for each zone present, in order of first appearance in indices.
+        Yields nothing when indices is empty.
+        """
+        if len(indices) == 0:
+            return
+
+        labels = self._zone_per_vertex[indices]
+
+        # Sort into contiguous zone segments (stable keeps indices ascending)
+        order = np.argsort(labels, kind='stable')
+        sorted_labels = labels[order]
+        starts = np.flatnonzero(np.r_[True, sorted_labels[1:] != sorted_labels[:-1]])
+        counts = np.diff(np.r_[starts, len(order)])
+
+        members = indices[order]
+        distances = distance_map[members]
+        means = np.add.reduceat(distances, starts, dtype=np.float64) / counts
+        extremes = extreme.reduceat(distances, starts)
+        centers = np.add.reduceat(self.body.vertices[members], starts, axis=0,
+                                  dtype=np.float64) / counts[:, None]
+
+        for seg in np.argsort(order[starts]):
+            start = starts[seg]
+            yield (self._ZONES[sorted_labels[start]], members[start:start + counts[seg]],
+                   means[seg], extremes[seg], centers[seg])
 
     def _find_compression_zones(self, distance_map: np.ndarray) -> List[FitIssue]:
         """Find areas where body is compressed by garment"""
         issues = []
 
-        # Find vertices with significant compression
-        compressed = distance_map < self.COMPRESSION_THRESHOLD
+        # Find covered vertices with significant compression
+        compressed = (distance_map < self.COMPRESSION_THRESHOLD) & ~self._uncovered
         compressed_indices = np.where(compressed)[0]
 
         if len(compressed_indices) == 0:
             return issues
 
-        # Group by body zone
-        zones = {}
-        for idx in compressed_indices:
-            zone = self._classify_body_zone(self.body.vertices[idx])
-            if zone not in zones:
-                zones[zone] = {'indices': [], 'distances': []}
-            zones[zone]['indices'].append(idx)
-            zones[zone]['distances'].append(distance_map[idx])
-
-        # Create issue for each zone
-        for zone, data in zones.items():
-            indices = data['indices']
-            distances = data['distances']
-
-            avg_compression = np.mean(distances)
-            max_compression = np.min(distances)  # Most negative
+        # Create issue for each body zone (max compression is most negative)
+        for zone, indices, avg_compression, max_compression, center in \
+                self._zone_stats(compressed_indices, distance_map, np.minimum):
 
             # Determine severity
             if max_compression < -30:
@@ -378,9 +418,6 @@ class FitAnalyzer:
             else:
                 severity = FitIssueSeverity.MINOR
 
-            # Center of compression zone
-            center = self.body.vertices[indices].mean(axis=0)
-
             # Zone-specific descriptions
             descriptions = {
                 BodyZone.SHOULDERS: "Shoulder compression - risk of ripping at shoulder seams",
@@ -401,7 +438,7 @@ class FitAnalyzer:
                 location=center,
                 amount=avg_compression,
                 description=descriptions.get(zone, f"Compression in {zone.value}"),
-                affected_vertices=indices
+                affected_vertices=indices.astype(np.int32)
             ))
 
         return issues
@@ -410,29 +447,17 @@ class FitAnalyzer:
         """Find areas where garment is too loose (tenting)"""
         issues = []
 
-        # Find vertices with significant gaps
-        gaps = distance_map > self.GAP_THRESHOLD_MINOR
+        # Find covered vertices with significant gaps (the garment not
+        # reaching a region at all isn't excess fabric there)
+        gaps = (distance_map > self.GAP_THRESHOLD_MINOR) & ~self._uncovered
         gap_indices = np.where(gaps)[0]
 
         if len(gap_indices) == 0:
             return issues
 
-        # Group by body zone
-        zones = {}
-        for idx in gap_indices:
-            zone = self._classify_body_zone(self.body.vertices[idx])
-            if zone not in zones:
-                zones[zone] = {'indices': [], 'distances': []}
-            zones[zone]['indices'].append(idx)
-            zones[zone]['distances'].append(distance_map[idx])
-
-        # Create issue for each zone
-        for zone, data in zones.items():
-            indices = data['indices']
-            distances = data['distances']
-
-            avg_gap = np.mean(distances)
-            max_gap = np.max(distances)
+        # Create issue for each body zone
+        for zone, indices, avg_gap, max_gap, center in \
+                self._zone_stats(gap_indices, distance_map, np.maximum):
 
             # Determine severity
             if max_gap > self.GAP_THRESHOLD_SEVERE:
@@ -442,9 +467,6 @@ class FitAnalyzer:
             else:
                 severity = FitIssueSeverity.MINOR
 
-            # Center of gap zone
-            center = self.body.vertices[indices].mean(axis=0)
-
             # Zone-specific descriptions for "lack of curves" issue
             descriptions = {
                 BodyZone.BUST: "Bust gap - tenting due to less projection than garment expects",
@@ -460,7 +482,7 @@ class FitAnalyzer:
                 location=center,
                 amount=avg_gap,
                 description=descriptions.get(zone, f"Excess fabric in {zone.value}"),
-                affected_vertices=indices
+                affected_vertices=indices.astype(np.int32)
             ))
 
         return issues
@@ -472,72 +494,36 @@ class FitAnalyzer:
         body_measurements = self.body.measurements
         garment_measurements = self.garment.measurements
 
-        # Check inseam
-        if body_measurements.inseam > 0 and garment_measurements.inseam_length > 0:
-            deficit = body_measurements.inseam - garment_measurements.inseam_length
-            if deficit > 10:  # More than 10mm short
-                severity = FitIssueSeverity.SEVERE if deficit > 50 else \
-                          FitIssueSeverity.MODERATE if deficit > 25 else \
-                          FitIssueSeverity.MINOR
-
-                issues.append(FitIssue(
-                    issue_type=FitIssueType.TOO_SHORT,
-                    severity=severity,
-                    body_zone=BodyZone.ANKLES,
-                    location=np.array([0, self.body.min_y, 0]),
-                    amount=deficit,
-                    description=f"Inseam {deficit:.0f}mm too short for body"
-                ))
-
-        # Check outseam
-        if body_measurements.outseam > 0 and garment_measurements.outseam_length > 0:
-            deficit = body_measurements.outseam - garment_measurements.outseam_length
-            if deficit > 10:
-                severity = FitIssueSeverity.SEVERE if deficit > 50 else \
-                          FitIssueSeverity.MODERATE if deficit > 25 else \
-                          FitIssueSeverity.MINOR
-
-                issues.append(FitIssue(
-                    issue_type=FitIssueType.TOO_SHORT,
-                    severity=severity,
-                    body_zone=BodyZone.ANKLES,
-                    location=np.array([0, self.body.min_y, 0]),
-                    amount=deficit,
-                    description=f"Outseam {deficit:.0f}mm too short"
-                ))
-
-        # Check rise
-        if body_measurements.front_rise > 0 and garment_measurements.front_rise > 0:
-            deficit = body_measurements.front_rise - garment_measurements.front_rise
-            if deficit > 10:
-                severity = FitIssueSeverity.SEVERE if deficit > 30 else \
-                          FitIssueSeverity.MODERATE
-
-                issues.append(FitIssue(
-                    issue_type=FitIssueType.TOO_SHORT,
-                    severity=severity,
-                    body_zone=BodyZone.CROTCH,
-                    location=self.body.landmarks.get(BodyLandmark.CROTCH,
-                                                      np.array([0, self.body.height * 0.4, 0])),
-                    amount=deficit,
-                    description=f"Rise {deficit:.0f}mm too short - will pull at crotch"
-                ))
-
-        # Check torso length
-        if body_measurements.torso_length > 0 and garment_measurements.body_length > 0:
-            # For shirts, body_length is torso
-            if self.garment.garment_type == GarmentType.SHIRT:
-                deficit = body_measurements.torso_length - garment_measurements.body_length
-                if deficit > 20:
-                    issues.append(FitIssue(
-                        issue_type=FitIssueType.TOO_SHORT,
-                        severity=FitIssueSeverity.MODERATE,
-                        body_zone=BodyZone.WAIST,
-                        location=self.body.landmarks.get(BodyLandmark.WAIST,
-                                                          np.array([0, self.body.height * 0.55, 0])),
-                        amount=deficit,
-                        description=f"Torso {deficit:.0f}mm too short - will ride up"
-                    ))
+        for check in _LENGTH_CHECKS:
+            if check.garment_type is not None and self.garment.garment_type != check.garment_type:
+                continue
+
+            body_length = getattr(body_measurements, check.body_measurement)
+            garment_length = getattr(garment_measurements, check.garment_measurement)
+            if body_length <= 0 or garment_length <= 0:
+                continue
+
+            deficit = body_length - garment_length
+            if deficit <= check.min_deficit:
+                continue
+
+            severity = next((sev for limit, sev in check.severities if deficit > limit),
+                            check.default_severity)
+
+            if check.fallback_height is None:
+                location = np.array([0, self.body.min_y, 0])
+            else:
+                location = self.body.landmarks.get(
+                    check.landmark, np.array([0, self.body.height * check.fallback_height, 0]))
+
+            issues.append(FitIssue(
+                issue_type=FitIssueType.TOO_SHORT,
+                severity=severity,
+                body_zone=check.body_zone,
+                location=location,
+                amount=deficit,
+                description=check.description.format(deficit)
+            ))
 
         return issues
 
@@ -552,47 +538,36 @@ class FitAnalyzer:
         expanded_verts = self.movement_envelope.expanded_vertices
 
         # Find nearest garment points
-        distances, _ = self._garment_tree.query(expanded_verts)
+        distances, _ = self._garment_tree.query(expanded_verts, workers=KDTREE_WORKERS)
 
-        # Where the movement envelope extends beyond the garment
-        conflicts = distances > 0  # Movement needs space garment doesn't provide
+        # Where the movement envelope extends beyond the garment by a
+        # significant amount (only these are reported), in regions the
+        # garment actually covers
+        conflict_indices = np.flatnonzero((distances > 30) & ~self._uncovered)
 
-        # Group by zone
-        for i, (dist, is_conflict) in enumerate(zip(distances, conflicts)):
-            if not is_conflict or dist < 20:  # Need significant space
-                continue
+        # One issue per zone, at its worst case
+        for zone, indices, _, dist, _ in \
+                self._zone_stats(conflict_indices, distances, np.maximum):
+            i = indices[np.argmax(distances[indices])]
+            issues.append(FitIssue(
+                issue_type=FitIssueType.MOVEMENT_CONFLICT,
+                severity=FitIssueSeverity.MODERATE,
+                body_zone=zone,
+                location=expanded_verts[i],
+                amount=dist,
+                description=f"Movement restricted in {zone.value} - need {dist:.0f}mm more ease"
+            ))
 
-            zone = self._classify_body_zone(self.body.vertices[i])
-
-            # Only report significant movement conflicts
-            if dist > 30:
-                issues.append(FitIssue(
-                    issue_type=FitIssueType.MOVEMENT_CONFLICT,
-                    severity=FitIssueSeverity.MODERATE,
-                    body_zone=zone,
-                    location=expanded_verts[i],
-                    amount=dist,
-                    description=f"Movement restricted in {zone.value} - need {dist:.0f}mm more ease"
-                ))
-
-        # Deduplicate by zone (keep worst case)
-        zone_issues = {}
-        for issue in issues:
-            if issue.body_zone not in zone_issues:
-                zone_issues[issue.body_zone] = issue
-            elif issue.amount > zone_issues[issue.body_zone].amount:
-                zone_issues[issue.body_zone] = issue
-
-        return list(zone_issues.values())
+        return issues
 
     def _generate_recommendations(self, issues: List[FitIssue]) -> List[ModificationRecommendation]:
         """Generate specific modification recommendations for each issue"""
         recommendations = []
         priority = 1
 
-        # Sort issues by severity
+        # Sort issues by severity, then by size (compression amounts are negative)
         sorted_issues = sorted(issues,
-                               key=lambda i: (i.severity.value, i.amount),
+                               key=lambda i: (_SEVERITY_RANK[i.severity], abs(i.amount)),
                                reverse=True)
 
         for issue in sorted_issues:
@@ -754,7 +729,8 @@ class FitAnalyzer:
 def analyze_fit(body_vertices: np.ndarray, body_faces: np.ndarray,
                 garment_vertices: np.ndarray, garment_faces: np.ndarray,
                 movement_profile: str = "wild",
-                garment_type: str = None) -> Dict[str, Any]:
+                garment_type: str = None,
+                analyzer: Optional[FitAnalyzer] = None) -> Dict[str, Any]:
     """
     Convenience function for API use.
 
@@ -765,23 +741,30 @@ def analyze_fit(body_vertices: np.ndarray, body_faces: np.ndarray,
         garment_faces: Garment mesh faces
         movement_profile: "default" or "wild"
         garment_type: Optional garment type
+        analyzer: Optional analyzer from a previous call on the same meshes;
+            its body, garment, spatial index and distance map are reused and
+            only the movement envelope is regenerated (mesh args are ignored)
 
     Returns:
         Complete fit analysis results
     """
-    # Analyze body
-    body = BodyModel(body_vertices, body_faces)
-    body.analyze()
+    if analyzer is None:
+        # Analyze body
+        body = BodyModel(body_vertices, body_faces)
+        body.analyze()
 
-    # Generate movement envelope
-    envelope = body.generate_movement_envelope(movement_profile)
+        # Analyze garment
+        garment = GarmentModel(garment_vertices, garment_faces)
+        garment.analyze(garment_type)
+
+        analyzer = FitAnalyzer(body, garment)
+    else:
+        body, garment = analyzer.body, analyzer.garment
 
-    # Analyze garment
-    garment = GarmentModel(garment_vertices, garment_faces)
-    garment.analyze(garment_type)
+    # Generate movement envelope
+    analyzer.movement_envelope = body.generate_movement_envelope(movement_profile)
 
     # Perform fit analysis
-    analyzer = FitAnalyzer(body, garment, envelope)
     result = analyzer.analyze()
 
     return {
@@ -412,12 +412,16 @@ def detect_garment(
 def draw_keypoints_on_image(
     image: np.ndarray,
     keypoints: List[Keypoint],
-    contour: Optional[np.ndarray] = None
+    contour: Optional[np.ndarray] = None,
+    in_place: bool = False
 ) -> np.ndarray:
     """
     Draw detected keypoints and contour on image for visualization.
+
+    With in_place=True the drawing goes straight onto `image`, saving a
+    full-frame copy when the caller no longer needs the original.
     """
-    output = image.copy()
+    output = image if in_place else image.copy()
 
     # Draw contour
     if contour is not None:
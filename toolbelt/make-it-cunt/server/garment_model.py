@@ -7,6 +7,9 @@ Designed for garments scanned on a dress form.
 Dependencies: numpy, scipy, trimesh (optional)
 """
 
+import math
+from functools import cached_property
+
 import numpy as np
 from dataclasses import dataclass, field
 from typing import Dict, List, Optional, Tuple, Any, Set
@@ -59,8 +62,8 @@ class Seam:
         return {
             'type': self.seam_type.value,
             'length': float(self.length),
-            'start': self.start_point.tolist(),
-            'end': self.end_point.tolist(),
+            'start': self.start_point,
+            'end': self.end_point,
             'vertex_count': len(self.vertices)
         }
 
@@ -84,8 +87,8 @@ class PatternPiece:
             'area': float(self.area),
             'seams': self.seams,
             'bounds_2d': {
-                'min': self.vertices_2d.min(axis=0).tolist(),
-                'max': self.vertices_2d.max(axis=0).tolist()
+                'min': self.vertices_2d.min(axis=0),
+                'max': self.vertices_2d.max(axis=0)
             }
         }
 
@@ -150,13 +153,59 @@ class GarmentModel:
         self.pattern_pieces: List[PatternPiece] = []
         self.measurements = GarmentMeasurements()
 
+        # Unit normal per face (zero for degenerate faces)
+        self.face_normals = self._compute_face_normals()
+
         # Mesh analysis helpers
         self._edge_to_faces: Dict[Tuple[int, int], List[int]] = {}
-        self._vertex_to_faces: Dict[int, Set[int]] = {}
         self._build_adjacency()
 
+    def _compute_face_normals(self) -> np.ndarray:
+        """Compute normal vectors for all faces at once"""
+        faces = np.asarray(self.faces)
+        v0 = self.vertices[faces[:, 0]]
+        normals = np.cross(self.vertices[faces[:, 1]] - v0, self.vertices[faces[:, 2]] - v0)
+
+        lengths = np.linalg.norm(normals, axis=1)
+        valid = lengths > 0
+        normals[valid] /= lengths[valid, None]
+        return normals
+
+    # Fit-analysis helpers, built on first use and kept for the garment's
+    # lifetime so one garment can be analyzed against many bodies.
+    # Fit is judged at mm scale, so these work in single precision
+
+    @cached_property
+    def vertices_f32(self) -> np.ndarray:
+        """Contiguous float32 copy of the vertices"""
+        return np.ascontiguousarray(self.vertices, dtype=np.float32)
+
+    @cached_property
+    def spatial_index(self) -> cKDTree:
+        """KD-tree over the vertices for nearest-point queries"""
+        return cKDTree(self.vertices_f32, leafsize=16, compact_nodes=True)
+
+    @cached_property
+    def vertex_normals(self) -> np.ndarray:
+        """Unit normal at every vertex: the average of its adjacent face normals"""
+        faces = np.asarray(self.faces)
+
+        # Scatter each face's unit normal onto its three vertices (degenerate
+        # faces have a zero normal, so they don't contribute)
+        unit = self.face_normals.astype(np.float32)
+        normals = np.zeros((len(self.vertices), 3), dtype=np.float32)
+        for k in range(3):
+            np.add.at(normals, faces[:, k], unit)
+
+        # Vertices with no usable face (or normals cancelling out) default to up
+        lengths = np.linalg.norm(normals, axis=1)
+        flat = lengths == 0
+        normals[flat] = [0, 1, 0]
+        lengths[flat] = 1
+        return normals / lengths[:, None]
+
     def _build_adjacency(self):
-        """Build edge and vertex adjacency maps"""
+        """Build edge adjacency map"""
         for face_idx, face in enumerate(self.faces):
             for i in range(3):
                 v1, v2 = face[i], face[(i + 1) % 3]
@@ -166,10 +215,6 @@ class GarmentModel:
                     self._edge_to_faces[edge] = []
                 self._edge_to_faces[edge].append(face_idx)
 
-                if v1 not in self._vertex_to_faces:
-                    self._vertex_to_faces[v1] = set()
-                self._vertex_to_faces[v1].add(face_idx)
-
     def analyze(self, garment_type: str = None) -> 'GarmentModel':
         """
         Full analysis pipeline.
@@ -256,40 +301,25 @@ class GarmentModel:
                 boundary_edges.append(edge)
 
         # Find sharp edges (high dihedral angle)
+        interior = [(edge, face_indices) for edge, face_indices in self._edge_to_faces.items()
+                    if len(face_indices) == 2]
         sharp_edges = []
-        for edge, face_indices in self._edge_to_faces.items():
-            if len(face_indices) == 2:
-                # Compute dihedral angle
-                f1, f2 = face_indices
-                n1 = self._face_normal(f1)
-                n2 = self._face_normal(f2)
+        if interior:
+            # Compute dihedral angles
+            pairs = np.array([face_indices for _, face_indices in interior])
+            n1 = self.face_normals[pairs[:, 0]]
+            n2 = self.face_normals[pairs[:, 1]]
 
-                cos_angle = np.clip(np.dot(n1, n2), -1, 1)
-                angle = np.arccos(cos_angle)
+            cos_angle = np.clip(np.einsum('ij,ij->i', n1, n2), -1, 1)
+            angle = np.arccos(cos_angle)
 
-                # Sharp edge threshold (> 30 degrees)
-                if angle > np.radians(30):
-                    sharp_edges.append(edge)
+            # Sharp edge threshold (> 30 degrees)
+            sharp_edges = [interior[i][0] for i in np.flatnonzero(angle > np.radians(30))]
 
         # Chain edges into seam lines
         seam_edges = set(boundary_edges + sharp_edges)
         self.seams = self._chain_edges_to_seams(seam_edges)
 
-    def _face_normal(self, face_idx: int) -> np.ndarray:
-        """Compute normal vector for a face"""
-        face = self.faces[face_idx]
-        v0, v1, v2 = self.vertices[face]
-
-        edge1 = v1 - v0
-        edge2 = v2 - v0
-        normal = np.cross(edge1, edge2)
-
-        length = np.linalg.norm(normal)
-        if length > 0:
-            normal = normal / length
-
-        return normal
-
     def _chain_edges_to_seams(self, edges: Set[Tuple[int, int]]) -> List[Seam]:
         """Chain connected edges into seam lines"""
         if not edges:
@@ -363,8 +393,9 @@ class GarmentModel:
         """
         # Get seam characteristics
         center = seam_vertices.mean(axis=0)
-        direction = seam_vertices[-1] - seam_vertices[0]
-        direction = direction / (np.linalg.norm(direction) + 1e-6)
+        # Vertical share of the end-to-end direction (scalar math, one per seam)
+        dx, dy, dz = (seam_vertices[-1] - seam_vertices[0]).tolist()
+        vertical = abs(dy) / (math.hypot(dx, dy, dz) + 1e-6)
 
         # Height range
         min_y = seam_vertices[:, 1].min()
@@ -376,10 +407,10 @@ class GarmentModel:
         rel_x = center[0]
 
         # Is it mostly vertical?
-        is_vertical = abs(direction[1]) > 0.7
+        is_vertical = vertical > 0.7
 
         # Is it mostly horizontal?
-        is_horizontal = abs(direction[1]) < 0.3
+        is_horizontal = vertical < 0.3
 
         # Classification based on garment type
         if self.garment_type == GarmentType.PANTS:
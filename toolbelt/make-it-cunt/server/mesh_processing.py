@@ -9,10 +9,14 @@ Dependencies: pymeshlab, open3d, trimesh, numpy
 """
 
 import os
+import queue
+import shutil
 import tempfile
+from contextlib import contextmanager
 from dataclasses import dataclass, field
-from typing import Optional, Tuple, List, Dict, Any
+from typing import Optional, Tuple, List, Dict, Any, BinaryIO
 from enum import Enum
+from io import BytesIO
 import numpy as np
 
 try:
@@ -69,11 +73,11 @@ class MeshStats:
             'vertex_count': self.vertex_count,
             'face_count': self.face_count,
             'bounding_box': {
-                'min': self.bounding_box[0].tolist(),
-                'max': self.bounding_box[1].tolist()
+                'min': self.bounding_box[0],
+                'max': self.bounding_box[1]
             },
-            'center': self.center.tolist(),
-            'dimensions': self.dimensions.tolist(),
+            'center': self.center,
+            'dimensions': self.dimensions,
             'is_watertight': self.is_watertight,
             'has_normals': self.has_normals,
             'unit': self.unit.value
@@ -111,6 +115,10 @@ class MeshProcessor:
         self.target_unit = target_unit
         self._check_dependencies()
 
+    def reset(self):
+        """Restore per-request settings so a pooled processor can be handed out again."""
+        self.target_unit = MeshUnit.MILLIMETERS
+
     def _check_dependencies(self):
         """Check which processing backends are available"""
         self.backends = {
@@ -123,109 +131,127 @@ class MeshProcessor:
             raise RuntimeError("No mesh processing backend available. Install trimesh, open3d, or pymeshlab.")
 
     def load_mesh(self, file_path: str = None, file_bytes: bytes = None,
-                  filename: str = None) -> ProcessedMesh:
+                  filename: str = None, file_obj: BinaryIO = None) -> ProcessedMesh:
         """
-        Load a mesh from file path or bytes.
+        Load a mesh from a file path, an open binary stream, or bytes.
 
         Args:
-            file_path: Path to mesh file (PLY, OBJ, STL)
-            file_bytes: Raw file bytes (for uploaded files)
-            filename: Original filename (for format detection when using bytes)
+            file_path: Path to mesh file (PLY, OBJ, STL); preferred, the loaders read it directly
+            file_bytes: Raw file bytes or a memoryview over them (for uploaded files)
+            filename: Original filename (for format detection when using a stream or bytes,
+                      and for logging when file_path is a temp file)
+            file_obj: Readable binary stream, e.g. an upload's werkzeug stream
 
         Returns:
             ProcessedMesh object with loaded data
         """
         if file_path:
-            filename = os.path.basename(file_path)
-        elif file_bytes and filename:
-            # Write to temp file for loading
+            return self._load_from_path(file_path, filename or os.path.basename(file_path))
+        elif filename and (file_obj is not None or file_bytes):
+            if file_obj is None:
+                file_obj = BytesIO(file_bytes)
+
+            # trimesh parses straight from the stream
+            if TRIMESH_AVAILABLE:
+                file_type = os.path.splitext(filename)[1].lower().lstrip('.')
+                return self._from_trimesh(trimesh.load(file_obj, file_type=file_type, force='mesh'), filename)
+
+            # Open3D only reads paths, so spool to a temp file
             suffix = os.path.splitext(filename)[1].lower()
             with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as f:
-                f.write(file_bytes)
+                shutil.copyfileobj(file_obj, f, length=1 << 20)
                 file_path = f.name
+            try:
+                return self._load_from_path(file_path, filename)
+            finally:
+                os.unlink(file_path)
         else:
-            raise ValueError("Must provide either file_path or (file_bytes and filename)")
-
-        # Detect format
-        ext = os.path.splitext(file_path)[1].lower()
+            raise ValueError("Must provide file_path, or filename with file_obj or file_bytes")
 
+    def _load_from_path(self, file_path: str, filename: str) -> ProcessedMesh:
+        """Load a mesh file with the best available backend."""
         # Load with trimesh (most flexible)
         if TRIMESH_AVAILABLE:
-            mesh = trimesh.load(file_path, force='mesh')
+            return self._from_trimesh(trimesh.load(file_path, force='mesh'), filename)
 
-            vertices = np.array(mesh.vertices)
-            faces = np.array(mesh.faces)
-            normals = np.array(mesh.vertex_normals) if mesh.vertex_normals is not None else None
+        elif OPEN3D_AVAILABLE:
+            return self._from_open3d(o3d.io.read_triangle_mesh(file_path), filename)
 
-            # Compute stats
-            bbox_min = vertices.min(axis=0)
-            bbox_max = vertices.max(axis=0)
-            center = (bbox_min + bbox_max) / 2
-            dimensions = bbox_max - bbox_min
+        else:
+            raise RuntimeError("No mesh loading backend available")
 
-            stats = MeshStats(
-                vertex_count=len(vertices),
-                face_count=len(faces),
-                bounding_box=(bbox_min, bbox_max),
-                center=center,
-                dimensions=dimensions,
-                is_watertight=mesh.is_watertight,
-                has_normals=normals is not None,
-                unit=self._detect_units(dimensions)
-            )
+    def _from_trimesh(self, mesh, filename: str) -> ProcessedMesh:
+        """Wrap a loaded trimesh mesh with stats."""
+        vertices = np.array(mesh.vertices)
+        faces = np.array(mesh.faces)
+        normals = np.array(mesh.vertex_normals) if mesh.vertex_normals is not None else None
 
-            processed = ProcessedMesh(
-                mesh=mesh,
-                mesh_type=MeshType.UNKNOWN,
-                stats=stats,
-                vertices=vertices,
-                faces=faces,
-                normals=normals,
-                original_filename=filename
-            )
-            processed.log(f"Loaded mesh from {filename}: {stats.vertex_count} vertices, {stats.face_count} faces")
+        # Compute stats
+        bbox_min = vertices.min(axis=0)
+        bbox_max = vertices.max(axis=0)
+        center = (bbox_min + bbox_max) / 2
+        dimensions = bbox_max - bbox_min
 
-            return processed
+        stats = MeshStats(
+            vertex_count=len(vertices),
+            face_count=len(faces),
+            bounding_box=(bbox_min, bbox_max),
+            center=center,
+            dimensions=dimensions,
+            is_watertight=mesh.is_watertight,
+            has_normals=normals is not None,
+            unit=self._detect_units(dimensions)
+        )
 
-        elif OPEN3D_AVAILABLE:
-            mesh = o3d.io.read_triangle_mesh(file_path)
-            mesh.compute_vertex_normals()
+        processed = ProcessedMesh(
+            mesh=mesh,
+            mesh_type=MeshType.UNKNOWN,
+            stats=stats,
+            vertices=vertices,
+            faces=faces,
+            normals=normals,
+            original_filename=filename
+        )
+        processed.log(f"Loaded mesh from {filename}: {stats.vertex_count} vertices, {stats.face_count} faces")
 
-            vertices = np.asarray(mesh.vertices)
-            faces = np.asarray(mesh.triangles)
-            normals = np.asarray(mesh.vertex_normals)
+        return processed
 
-            bbox_min = vertices.min(axis=0)
-            bbox_max = vertices.max(axis=0)
-            center = (bbox_min + bbox_max) / 2
-            dimensions = bbox_max - bbox_min
+    def _from_open3d(self, mesh, filename: str) -> ProcessedMesh:
+        """Wrap a loaded Open3D mesh with stats."""
+        mesh.compute_vertex_normals()
 
-            stats = MeshStats(
-                vertex_count=len(vertices),
-                face_count=len(faces),
-                bounding_box=(bbox_min, bbox_max),
-                center=center,
-                dimensions=dimensions,
-                is_watertight=mesh.is_watertight(),
-                has_normals=True,
-                unit=self._detect_units(dimensions)
-            )
+        vertices = np.asarray(mesh.vertices)
+        faces = np.asarray(mesh.triangles)
+        normals = np.asarray(mesh.vertex_normals)
 
-            processed = ProcessedMesh(
-                mesh=mesh,
-                mesh_type=MeshType.UNKNOWN,
-                stats=stats,
-                vertices=vertices,
-                faces=faces,
-                normals=normals,
-                original_filename=filename
-            )
-            processed.log(f"Loaded mesh from {filename} using Open3D")
+        bbox_min = vertices.min(axis=0)
+        bbox_max = vertices.max(axis=0)
+        center = (bbox_min + bbox_max) / 2
+        dimensions = bbox_max - bbox_min
 
-            return processed
+        stats = MeshStats(
+            vertex_count=len(vertices),
+            face_count=len(faces),
+            bounding_box=(bbox_min, bbox_max),
+            center=center,
+            dimensions=dimensions,
+            is_watertight=mesh.is_watertight(),
+            has_normals=True,
+            unit=self._detect_units(dimensions)
+        )
 
-        else:
-            raise RuntimeError("No mesh loading backend available")
+        processed = ProcessedMesh(
+            mesh=mesh,
+            mesh_type=MeshType.UNKNOWN,
+            stats=stats,
+            vertices=vertices,
+            faces=faces,
+            normals=normals,
+            original_filename=filename
+        )
+        processed.log(f"Loaded mesh from {filename} using Open3D")
+
+        return processed
 
     def _detect_units(self, dimensions: np.ndarray) -> MeshUnit:
         """
@@ -636,17 +662,36 @@ class MeshProcessor:
             raise RuntimeError("No export backend available")
 
 
+# Pooled processors for the API handlers
+_PROCESSOR_POOL: "queue.LifoQueue[MeshProcessor]" = queue.LifoQueue()
+
+
+@contextmanager
+def acquire_processor():
+    """Borrow a MeshProcessor from the shared pool, creating one if none are free."""
+    try:
+        processor = _PROCESSOR_POOL.get_nowait()
+    except queue.Empty:
+        processor = MeshProcessor()
+    try:
+        yield processor
+    finally:
+        processor.reset()
+        _PROCESSOR_POOL.put(processor)
+
+
 # Convenience functions for API use
-def process_body_scan(file_bytes: bytes, filename: str) -> Dict[str, Any]:
+def process_body_scan(file_bytes: bytes = None, filename: str = None,
+                      file_path: str = None) -> Dict[str, Any]:
     """
-    Process a body scan from uploaded file.
+    Process a body scan from uploaded file bytes or a path on disk.
 
     Returns dict with mesh stats and processing info.
     """
-    processor = MeshProcessor()
-    mesh = processor.load_mesh(file_bytes=file_bytes, filename=filename)
-    mesh = processor.clean_mesh(mesh)
-    mesh = processor.orient_body(mesh)
+    with acquire_processor() as processor:
+        mesh = processor.load_mesh(file_path=file_path, file_bytes=file_bytes, filename=filename)
+        mesh = processor.clean_mesh(mesh)
+        mesh = processor.orient_body(mesh)
 
     return {
         'success': True,
@@ -656,17 +701,17 @@ def process_body_scan(file_bytes: bytes, filename: str) -> Dict[str, Any]:
     }
 
 
-def process_garment_scan(file_bytes: bytes, filename: str,
-                         garment_type: str = "pants") -> Dict[str, Any]:
+def process_garment_scan(file_bytes: bytes = None, filename: str = None,
+                         garment_type: str = "pants", file_path: str = None) -> Dict[str, Any]:
     """
-    Process a garment scan from uploaded file.
+    Process a garment scan from uploaded file bytes or a path on disk.
 
     Returns dict with mesh stats and processing info.
     """
-    processor = MeshProcessor()
-    mesh = processor.load_mesh(file_bytes=file_bytes, filename=filename)
-    mesh = processor.clean_mesh(mesh)
-    mesh = processor.orient_garment(mesh, garment_type)
+    with acquire_processor() as processor:
+        mesh = processor.load_mesh(file_path=file_path, file_bytes=file_bytes, filename=filename)
+        mesh = processor.clean_mesh(mesh)
+        mesh = processor.orient_garment(mesh, garment_type)
 
     return {
         'success': True,
@@ -0,0 +1,73 @@
+"""
+Fit analysis regression tests.
+
+Run from this directory: python -m unittest test_fit_analysis
+"""
+
+import unittest
+
+import numpy as np
+
+from body_model import BodyModel, MovementEnvelope
+from fit_analysis import FitAnalyzer, FitIssueType
+from garment_model import GarmentModel
+
+
+def cylinder_mesh(radius=150.0, height=1700.0, rings=18, segments=24):
+    """Closed-sided cylinder along Y as (vertices, faces)"""
+    angles = np.linspace(0, 2 * np.pi, segments, endpoint=False)
+    ys = np.linspace(0, height, rings)
+    vertices = np.array([[radius * np.cos(a), y, radius * np.sin(a)]
+                         for y in ys for a in angles])
+
+    faces = []
+    for r in range(rings - 1):
+        for s in range(segments):
+            a = r * segments + s
+            b = r * segments + (s + 1) % segments
+            faces.append([a, b, a + segments])
+            faces.append([b, b + segments, a + segments])
+    return vertices, np.array(faces)
+
+
+class MovementConflictTest(unittest.TestCase):
+
+    def test_fit_without_movement_conflicts(self):
+        # Envelope identical to the body and garment: nothing is more than
+        # 30mm away, so there are no movement conflicts to group
+        vertices, faces = cylinder_mesh()
+        body = BodyModel(vertices, faces)
+        garment = GarmentModel(vertices, faces)
+        envelope = MovementEnvelope(base_mesh_vertices=body.vertices,
+                                    expanded_vertices=body.vertices,
+                                    ease_map={})
+
+        result = FitAnalyzer(body, garment, envelope).analyze()
+
+        self.assertFalse([i for i in result.issues
+                          if i.issue_type == FitIssueType.MOVEMENT_CONFLICT])
+        self.assertEqual(result.to_dict()['issue_count'], len(result.issues))
+
+
+class UncoveredRegionTest(unittest.TestCase):
+
+    def test_uncovered_body_is_not_a_gap(self):
+        # Garment is the lower half of the body: the upper half is far from
+        # any garment vertex and must not be reported as excess fabric
+        vertices, faces = cylinder_mesh()
+        garment_vertices, garment_faces = cylinder_mesh(height=850.0, rings=9)
+        body = BodyModel(vertices, faces)
+        garment = GarmentModel(garment_vertices, garment_faces)
+
+        analyzer = FitAnalyzer(body, garment)
+        result = analyzer.analyze()
+
+        self.assertTrue(analyzer._uncovered.any())
+        for issue in result.issues:
+            if issue.affected_vertices is not None:
+                self.assertFalse(analyzer._uncovered[issue.affected_vertices].any())
+        self.assertFalse([i for i in result.issues if i.issue_type == FitIssueType.GAP])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,13 @@
+"""
+WSGI entry point for Make It Cunt v3.0
+
+Run with a threaded server so large mesh uploads don't block other requests:
+    gunicorn -w 2 -k gthread --threads 8 --timeout 600 -b 127.0.0.1:5050 wsgi:app
+
+OpenCV's thread pool is capped per process by ARUCO_CV_THREADS (default 2);
+raise it when running a single worker.
+
+`python app.py` still starts the Flask development server for local debugging.
+"""
+
+from app import app